@@ -5,9 +5,15 @@ auto_pitch_entry.py
 ENTRYPOINT wrapper that:
 - resolves model path from ./data/models/<user>/<model_name>/model.pth
 - reads model.meta.json for target_f0_hz (if present)
-- estimates input f0 (if possible)
+- estimates input f0 (if possible; sampled YIN statistics, see pitch_stats.py)
 - computes pitch shift automatically (unless --pitch provided)
-- calls rvc_infer_cli.py with the computed pitch
+- runs rvc_infer_cli in-process with the computed pitch, or submits the job to a
+  resident rvc_server.py when RVC_SERVER is set (http://host:port or unix:/path)
+
+In-process mode takes the input f0 from the pipeline's own pitch analysis, so
+the conversion reuses it instead of running harvest a second time. Setting
+RVC_INFER_CLI or RVC_IN_PROCESS=0 restores the old subprocess call, which
+estimates f0 with a separate harvest pass.
 
 This keeps inferencing separate from training.
 
@@ -33,9 +39,6 @@ from shutil import which
 from typing import Optional, List
 
 import numpy as np
-import soundfile as sf
-import librosa
-import pyworld as pw
 
 # Newly imported for cleanup
 import shutil
@@ -207,34 +210,51 @@ def _read_target_f0_hz_from_meta(model_path: str) -> Optional[float]:
 
 def _median_f0_hz_from_audio(path: str, target_sr: int = 16000) -> Optional[float]:
     """
-    Compute median voiced f0 (Hz) using WORLD harvest+stonemask.
+    Compute median voiced f0 (Hz). By default this samples energetic regions
+    with pitch_stats (YIN) within RVC_AUTO_PITCH_BUDGET_S seconds;
+    RVC_AUTO_PITCH_ESTIMATOR=harvest runs WORLD harvest+stonemask over the
+    whole song instead. If the sampled median's confidence interval has not
+    converged within the budget, RVC_AUTO_PITCH_FALLBACK decides: "none"
+    (default) keeps the sampled median, "full" runs YIN over every energetic
+    region, "harvest" runs the harvest pass.
     """
     try:
-        audio, sr = sf.read(path, always_2d=False)
+        from my_utils import load_audio
+
+        # Shares the decoded-audio cache with the conversion
+        audio = load_audio(path, target_sr)
+        sr = target_sr
     except Exception as e:
         print(f"[auto_pitch] WARN: failed to read {path}: {e}")
         return None
 
-    # mono
-    if isinstance(audio, np.ndarray) and audio.ndim == 2:
-        audio = np.mean(audio, axis=1)
-    audio = np.asarray(audio, dtype=np.float32)
-
     if audio.size < 1:
         return None
 
-    if sr != target_sr:
-        try:
-            audio = librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
-            sr = target_sr
-        except Exception as e:
-            print(f"[auto_pitch] WARN: resample failed {path}: {e}")
-            return None
-
     audio = np.nan_to_num(audio)
+
+    if os.getenv("RVC_AUTO_PITCH_ESTIMATOR", "fast") != "harvest":
+        from pitch_stats import pitch_stats
+
+        stats = pitch_stats(audio, sr=sr, budget_s=float(os.getenv("RVC_AUTO_PITCH_BUDGET_S", "0.05")))
+        fallback = "none" if stats.converged else os.getenv("RVC_AUTO_PITCH_FALLBACK", "none")
+        if fallback == "full":
+            stats = pitch_stats(audio, sr=sr, budget_s=0.0, exhaustive=True)
+        pct = ", ".join(f"p{p}={v:.1f}" for p, v in stats.percentiles.items())
+        print(
+            f"[auto_pitch] sampled f0: median={stats.median} Hz ({pct}), voiced={stats.voiced_ratio:.2f}, "
+            f"ci={stats.ci_st:.2f} st{'' if stats.converged else ' (not converged)'} over {stats.regions} regions "
+            f"in {stats.elapsed * 1000:.0f} ms"
+        )
+        if fallback != "harvest":
+            return stats.median
+        print("[auto_pitch] falling back to harvest")
+
     x = audio.astype(np.float64)
 
     try:
+        import pyworld as pw
+
         f0, t = pw.harvest(
             x,
             fs=sr,
@@ -247,6 +267,10 @@ def _median_f0_hz_from_audio(path: str, target_sr: int = 16000) -> Optional[floa
         print(f"[auto_pitch] WARN: pyworld failed {path}: {e}")
         return None
 
+    return _median_voiced_hz(f0)
+
+
+def _median_voiced_hz(f0) -> Optional[float]:
     f0 = np.asarray(f0).reshape(-1)
     f0 = f0[np.isfinite(f0)]
     f0 = f0[(f0 > 50.0) & (f0 < 1100.0)]
@@ -256,6 +280,39 @@ def _median_f0_hz_from_audio(path: str, target_sr: int = 16000) -> Optional[floa
     return float(np.median(f0))
 
 
+def _in_process_enabled() -> bool:
+    # A custom RVC_INFER_CLI (or RVC_IN_PROCESS=0) keeps the old subprocess call.
+    return os.getenv("RVC_IN_PROCESS", "1") != "0" and not os.getenv("RVC_INFER_CLI")
+
+
+def _median_f0_hz_shared(
+    model_path: str, input_path: str, f0_method: str, crepe_hop_length: int, passthru: List[str]
+) -> Optional[float]:
+    """
+    Median voiced f0 (Hz) taken from the pipeline's own pitch analysis.
+    The contour stays in the f0 cache, so the in-process conversion that
+    follows does not run the pitch tracker a second time. The passthrough
+    rvc_infer_cli flags are applied to the config first, so the model is
+    loaded and the f0 computed (and keyed) exactly as the conversion will.
+    """
+    try:
+        import rvc_infer_cli
+
+        # placeholders for the CLI's required args; only the tuning flags are used
+        cli_args, _ = rvc_infer_cli.build_parser().parse_known_args(
+            ["--user", "-", "--model_name", "-", "--input", "-"] + passthru
+        )
+        rvc_core = rvc_infer_cli.apply_config(cli_args)
+
+        handle = rvc_core.load_model(model_path)
+        f0 = rvc_core.analyze_f0(input_path, f0_method, crepe_hop_length, handle)
+    except Exception as e:
+        print(f"[auto_pitch] WARN: pipeline pitch analysis failed {input_path}: {e}")
+        return None
+
+    return _median_voiced_hz(f0)
+
+
 def _hz_to_semitones(src_hz: float, dst_hz: float) -> int:
     """
     Convert src->dst pitch ratio to nearest semitone integer shift.
@@ -301,6 +358,9 @@ def main():
     model_path = _resolve_model_path(args.model, args.user, args.model_name)
     input_path = _resolve_song_input(args.input)
 
+    server = os.getenv("RVC_SERVER", "").strip()
+    in_process = not server and _in_process_enabled()
+
     # If user explicitly passed pitch, do not compute.
     pitch = args.pitch
     if pitch is None:
@@ -309,7 +369,12 @@ def main():
             print("[auto_pitch] No target_f0_hz in model.meta.json. Using pitch=0.")
             pitch = 0
         else:
-            src_f0 = _median_f0_hz_from_audio(input_path)
+            if in_process:
+                src_f0 = _median_f0_hz_shared(
+                    model_path, input_path, args.f0_method, args.crepe_hop_length, passthru
+                )
+            else:
+                src_f0 = _median_f0_hz_from_audio(input_path)
             if src_f0 is None:
                 print("[auto_pitch] Could not estimate input f0. Using pitch=0.")
                 pitch = 0
@@ -317,10 +382,31 @@ def main():
                 pitch = _hz_to_semitones(src_f0, target_f0)
                 print(f"[auto_pitch] input_f0={src_f0:.2f} Hz, target_f0={target_f0:.2f} Hz -> pitch={pitch} st")
 
-    # Call the actual inferencer
-    rvc_cli = os.getenv("RVC_INFER_CLI", str(Path(__file__).resolve().parent / "rvc_infer_cli.py"))
-    cmd = [sys.executable, rvc_cli, "--user", args.user, "--model_name", args.model_name]
-    cmd += [
+    # Hand the job to a resident rvc_server.py if one is configured
+    if server:
+        from rvc_server import submit_job
+
+        if passthru:
+            print(f"[auto_pitch] WARN: extra args are not forwarded to the server: {passthru}")
+        job = {
+            "user": args.user,
+            "model_name": args.model_name,
+            "model": model_path,
+            "input": input_path,
+            "output": args.output,
+            "index": args.index,
+            "pitch": int(pitch),
+            "f0_method": args.f0_method,
+            "index_rate": float(args.index_rate),
+            "crepe_hop_length": int(args.crepe_hop_length),
+        }
+        print(f"[auto_pitch] submitting job to {server}")
+        reply = submit_job(server, job)
+        print(f"[auto_pitch] done: {reply['output']} timings={reply['timings']}")
+        return
+
+    cli_args = ["--user", args.user, "--model_name", args.model_name]
+    cli_args += [
         "--model", model_path,
         "--input", input_path,
         "--pitch", str(int(pitch)),
@@ -329,13 +415,26 @@ def main():
         "--crepe_hop_length", str(int(args.crepe_hop_length)),
     ]
     if args.output:
-        cmd += ["--output", args.output]
+        cli_args += ["--output", args.output]
 
     if args.index:
-        cmd += ["--index", args.index]
+        cli_args += ["--index", args.index]
 
     # passthru unknown args (keeps old behavior)
-    cmd += passthru
+    cli_args += passthru
+
+    # Run the inferencer in this process: the loaded model and the pitch
+    # analysis above are reused instead of being redone by a child process.
+    if in_process:
+        import rvc_infer_cli
+
+        print("[auto_pitch] running in-process: rvc_infer_cli", " ".join(cli_args))
+        rvc_infer_cli.main(cli_args)
+        return
+
+    # Call the actual inferencer
+    rvc_cli = os.getenv("RVC_INFER_CLI", str(Path(__file__).resolve().parent / "rvc_infer_cli.py"))
+    cmd = [sys.executable, rvc_cli] + cli_args
 
     print("[auto_pitch] running:", " ".join(cmd))
     subprocess.check_call(cmd)
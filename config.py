@@ -1,5 +1,7 @@
+import os
 import torch
 from multiprocessing import cpu_count
+from precision import cpu_bf16_supported
 
 
 class Config:
@@ -19,6 +21,63 @@ class Config:
         self.use_gfloat = False
         self.paperspace = False
 
+        # Resident voice models kept by rvc_core.registry (count / MB budget, 0 = no MB limit)
+        self.model_cache_size = int(os.getenv("RVC_MODEL_CACHE_SIZE", "4"))
+        self.model_cache_mb = int(os.getenv("RVC_MODEL_CACHE_MB", "0"))
+
+        # Chunks converted per HuBERT / synthesizer batch in VC.pipeline (1 = sequential)
+        self.segment_batch = int(os.getenv("RVC_SEGMENT_BATCH", "1"))
+
+        # Fold weight norm and drop training-only modules when a voice model loads
+        # (model_opt.py); RVC_OPTIMIZE_CHECK=1 also logs a parity check against
+        # the unoptimized model
+        self.optimize_models = os.getenv("RVC_OPTIMIZE", "1") != "0"
+        self.optimize_check = os.getenv("RVC_OPTIMIZE_CHECK", "0") == "1"
+
+        # Synthesizer execution: "torch" or "onnx" (ONNX Runtime CPU, f0 models only;
+        # see onnx_synth.py). 0 threads = ORT default.
+        self.synth_backend = os.getenv("RVC_SYNTH_BACKEND", "torch")
+        self.synth_threads = int(os.getenv("RVC_SYNTH_THREADS", "0"))
+
+        # HuBERT execution: "torch" (fairseq) or "onnx" (ONNX Runtime CPU, no fairseq
+        # import once exported; see onnx_hubert.py)
+        self.hubert_backend = os.getenv("RVC_HUBERT_BACKEND", "torch")
+        self.hubert_threads = int(os.getenv("RVC_HUBERT_THREADS", "0"))
+
+        # Dynamic int8 quantization of HuBERT and the text encoder on CPU (model_quant.py);
+        # RVC_QUANTIZE_REPORT=1 logs SNR / mel distance / speed against fp32 at load
+        self.quantize = os.getenv("RVC_QUANTIZE", "0") == "1"
+        self.quantize_report = os.getenv("RVC_QUANTIZE_REPORT", "0") == "1"
+
+        # CPU precision profile: fp32 | bf16 (autocast) | auto (bf16 if the CPU has
+        # native bf16), with optional per-stage overrides (see precision.py)
+        self.precision = os.getenv("RVC_PRECISION", "fp32")
+        self.precision_hubert = os.getenv("RVC_PRECISION_HUBERT", "")
+        self.precision_synth = os.getenv("RVC_PRECISION_SYNTH", "")
+
+        # Energy VAD: frames this many dB below the loudest frame count as silence
+        self.silence_threshold_db = float(os.getenv("RVC_SILENCE_DB", "-40"))
+        # Skip HuBERT/synthesizer on silences at least this long (seconds, 0 = off),
+        # keeping silence_pad_s of context converted on each side
+        self.skip_silence_s = float(os.getenv("RVC_SKIP_SILENCE_S", "0"))
+        self.silence_pad_s = float(os.getenv("RVC_SILENCE_PAD_S", "0.25"))
+
+        # Stream the 48 Hz high-pass and t_pad padding in blocks of this many
+        # seconds (0 = one sosfiltfilt over the whole song)
+        self.hp_block_s = float(os.getenv("RVC_HP_BLOCK_S", "0"))
+
+        # Processes for harvest/dio pitch analysis (1 = serial, 0 = one per CPU)
+        self.f0_workers = int(os.getenv("RVC_F0_WORKERS", "1"))
+
+        # Crepe execution: "predict" (torchcrepe.predict on the whole song),
+        # "stream" (fixed-size torch frame batches) or "onnx" (ONNX Runtime, CPU).
+        # Batch size is in frames, 0 threads = torch/ORT default.
+        self.crepe_mode = os.getenv("RVC_CREPE_MODE", "predict")
+        self.crepe_batch = int(os.getenv("RVC_CREPE_BATCH", "512"))
+        self.crepe_threads = int(os.getenv("RVC_CREPE_THREADS", "0"))
+        self.crepe_precision = os.getenv("RVC_CREPE_PRECISION", "fp32")  # fp32 | fp16 (CUDA) | bf16 (stream)
+        self.crepe_decoder = os.getenv("RVC_CREPE_DECODER", "viterbi")  # viterbi | argmax (stream/onnx)
+
         if self.use_gfloat:
             print("Using g_float instead of g_half")
             self.is_half = False
@@ -66,12 +125,15 @@ class Config:
         else:
             print("No supported Nvidia cards found, using CPU for inference")
             self.device = "cpu"
+            print(f"CPU bf16 support: {'native' if cpu_bf16_supported() else 'none (bf16 profiles will be slow)'}")
             # Fork Feature: Force g_float (is_half = False) if --use_gfloat arg is used.
             if not self.use_gfloat:
                 self.is_half = False
 
         if self.n_cpu == 0:
             self.n_cpu = cpu_count()
+        if self.f0_workers == 0:
+            self.f0_workers = self.n_cpu
 
         # Adjust padding and query sizes depending on precision and VRAM
         if self.is_half:
@@ -0,0 +1,198 @@
+# f0_crepe.py
+"""
+Bounded-memory crepe pitch tracking for CPU workers.
+
+torchcrepe.predict builds frames for the whole song in small batches tied to
+the hop length, and the old caller normalized the song with a full-array
+quantile first. Here frames are cut batch by batch (``batch_frames`` at a
+time, so peak memory does not grow with song length), each batch runs
+through the torch model, optionally under fp16/bf16 autocast, or through an
+ONNX Runtime export of it, and is decoded to pitch and periodicity before the
+next batch is built.
+
+No global normalization is needed: torchcrepe.preprocess standardizes every
+1024-sample frame on its own. Viterbi decoding runs per batch, seeded with
+the transition row of the previous batch's last bin so the path stays
+continuous across batch boundaries.
+"""
+
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+import torchcrepe
+
+from rvc_cache import CACHE_ROOT
+
+PRECISIONS = {"fp32": None, "fp16": torch.float16, "bf16": torch.bfloat16}
+
+_ort_sessions = {}
+
+
+@contextmanager
+def _thread_budget(threads):
+    """Cap torch's intra-op threads at ``threads`` (0 = leave as is)."""
+    if not threads:
+        yield
+        return
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def _torch_model(capacity, device):
+    infer = torchcrepe.infer
+    if getattr(infer, "capacity", None) != capacity or not hasattr(infer, "model"):
+        torchcrepe.load.model(device, capacity)
+    infer.model = infer.model.to(device)
+    return infer.model
+
+
+def _onnx_path(capacity):
+    return os.path.join(CACHE_ROOT, "crepe", f"crepe-{capacity}.onnx")
+
+
+def _onnx_session(capacity, threads):
+    """ORT session for the crepe model, exporting it on first use."""
+    key = (capacity, threads)
+    sess = _ort_sessions.get(key)
+    if sess is not None:
+        return sess
+
+    import onnxruntime as ort
+
+    path = _onnx_path(capacity)
+    if not os.path.exists(path):
+        model = _torch_model(capacity, "cpu")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                torch.zeros(4, torchcrepe.WINDOW_SIZE),
+                tmp,
+                input_names=["frames"],
+                output_names=["probabilities"],
+                dynamic_axes={"frames": {0: "batch"}, "probabilities": {0: "batch"}},
+                opset_version=17,
+            )
+        os.replace(tmp, path)
+        print(f"[f0_crepe] exported crepe-{capacity} to {path}")
+
+    opts = ort.SessionOptions()
+    if threads:
+        opts.intra_op_num_threads = threads
+        opts.inter_op_num_threads = 1
+    sess = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+    _ort_sessions[key] = sess
+    return sess
+
+
+def _transition():
+    if not hasattr(_transition, "matrix"):
+        xx, yy = np.meshgrid(range(torchcrepe.PITCH_BINS), range(torchcrepe.PITCH_BINS))
+        t = np.maximum(12 - abs(xx - yy), 0).astype(np.float64)
+        _transition.matrix = t / t.sum(axis=1, keepdims=True)
+    return _transition.matrix
+
+
+def _viterbi(probs, prior, lo, hi):
+    """Bin path through one batch, decoded like torchcrepe.decode.viterbi."""
+    import librosa
+
+    obs = np.exp(probs)
+    obs[:, :lo] = 0.0
+    obs[:, hi:] = 0.0
+    obs /= obs.sum(axis=1, keepdims=True)
+    return librosa.sequence.viterbi(obs.T, _transition(), p_init=prior).astype(np.int64)
+
+
+def _weighted_argmax(probs, bins):
+    """Cents-weighted mean of the 9 bins around each frame's argmax, in cents."""
+    idx = bins[:, None] + np.arange(-4, 5)[None, :]
+    valid = (idx >= 0) & (idx < probs.shape[1])
+    idx = np.clip(idx, 0, probs.shape[1] - 1)
+    w = np.where(valid, np.take_along_axis(probs, idx, axis=1), 0.0)
+    cents = torchcrepe.CENTS_PER_BIN * idx + 1997.3794084376191
+    return (w * cents).sum(axis=1) / np.maximum(w.sum(axis=1), 1e-12)
+
+
+def crepe_f0(
+    x,
+    sr=16000,
+    hop_length=128,
+    f0_min=50.0,
+    f0_max=1100.0,
+    capacity="full",
+    device="cpu",
+    backend="torch",
+    batch_frames=512,
+    threads=0,
+    precision="fp32",
+    decoder="viterbi",
+):
+    """
+    Crepe f0 (Hz) and periodicity, one value per ``hop_length`` samples
+    (``len(x) // hop_length + 1`` frames, like torchcrepe.predict with pad=True).
+
+    backend     "torch" or "onnx" (ONNX Runtime, CPU)
+    precision   "fp32", "fp16" or "bf16" autocast (torch backend only; fp16
+                needs a CUDA device, CPU autocast only has bf16)
+    decoder     "viterbi" or "argmax" (weighted argmax)
+    """
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown crepe backend: {backend}")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown crepe precision: {precision}")
+    if decoder not in ("viterbi", "argmax"):
+        raise ValueError(f"Unknown crepe decoder: {decoder}")
+
+    device = torch.device(device)
+    if backend == "torch" and precision == "fp16" and device.type == "cpu":
+        raise ValueError("crepe fp16 autocast needs a CUDA device; use bf16 or fp32 on CPU")
+    audio = torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32))[None]
+    n_frames = 1 + audio.shape[1] // hop_length
+    lo = int(torchcrepe.convert.frequency_to_bins(torch.tensor(f0_min)))
+    hi = int(torchcrepe.convert.frequency_to_bins(torch.tensor(f0_max), torch.ceil))
+
+    pitch = np.empty(n_frames, dtype=np.float32)
+    periodicity = np.empty(n_frames, dtype=np.float32)
+    prior = np.full(torchcrepe.PITCH_BINS, 1.0 / torchcrepe.PITCH_BINS)
+
+    if backend == "onnx":
+        sess = _onnx_session(capacity, threads)
+        device = torch.device("cpu")
+    else:
+        model = _torch_model(capacity, device)
+        dtype = PRECISIONS[precision]
+
+    done = 0
+    with _thread_budget(threads), torch.no_grad():
+        for frames in torchcrepe.preprocess(audio, sr, hop_length, batch_frames, device, pad=True):
+            if backend == "onnx":
+                probs = sess.run(None, {"frames": frames.numpy()})[0]
+            elif dtype is None:
+                probs = model(frames).cpu().numpy()
+            else:
+                with torch.autocast(device.type, dtype=dtype):
+                    probs = model(frames)
+                probs = probs.float().cpu().numpy()
+
+            probs = probs.astype(np.float64, copy=False)
+            if decoder == "viterbi":
+                bins = _viterbi(probs, prior, lo, hi)
+                prior = _transition()[bins[-1]]
+                hz = torchcrepe.convert.bins_to_frequency(torch.from_numpy(bins)).numpy()
+            else:
+                bins = lo + np.argmax(probs[:, lo:hi], axis=1)
+                hz = torchcrepe.convert.cents_to_frequency(_weighted_argmax(probs, bins))
+
+            n = bins.shape[0]
+            pitch[done : done + n] = hz
+            periodicity[done : done + n] = probs[np.arange(n), bins]
+            done += n
+    return pitch[:done], periodicity[:done]
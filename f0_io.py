@@ -0,0 +1,54 @@
+# f0_io.py
+"""
+f0 post-processing and user f0 curve loading for VC.pipeline.
+
+coarse_f0() is the mel-scale quantization of VC.get_f0 done in one buffer:
+mel conversion, scaling onto 1..255 and rounding all run in place on a
+single float64 scratch array, and the Hz contour is returned as is instead
+of being copied first.
+
+load_f0_file() reads a user-supplied f0 curve in bulk: ``.npy`` files are
+loaded directly, anything else is parsed as ``time,hz`` CSV by NumPy. A 1-D
+``.npy`` is taken as a contour at 100 frames per second.
+"""
+
+import numpy as np
+
+F0_MIN = 50
+F0_MAX = 1100
+
+
+def coarse_f0(f0, f0_min=F0_MIN, f0_max=F0_MAX):
+    """Quantize an f0 contour (Hz) to the synthesizer's 1..255 pitch bins."""
+    mel_min = 1127 * np.log(1 + f0_min / 700)
+    mel_max = 1127 * np.log(1 + f0_max / 700)
+    mel = np.divide(f0, 700.0, dtype=np.float64)
+    np.log1p(mel, out=mel)
+    mel *= 1127
+    # unvoiced frames (mel == 0) end up below 1 and are clipped to bin 1
+    mel -= mel_min
+    mel *= 254 / (mel_max - mel_min)
+    mel += 1
+    np.clip(mel, 1, 255, out=mel)
+    np.rint(mel, out=mel)
+    return mel.astype(np.int64)
+
+
+def load_f0_file(f0_file):
+    """
+    (N, 2) float32 array of (seconds, Hz) rows from a path or an object with
+    a ``.name`` path (as passed by gradio), or None if there is no file.
+    """
+    path = getattr(f0_file, "name", f0_file)
+    if not isinstance(path, str) or not path:
+        return None
+    if path.lower().endswith(".npy"):
+        inp_f0 = np.load(path).astype(np.float32, copy=False)
+        if inp_f0.ndim == 1:
+            t = np.arange(inp_f0.shape[0], dtype=np.float32) / 100
+            inp_f0 = np.stack([t, inp_f0], axis=1)
+    else:
+        inp_f0 = np.loadtxt(path, delimiter=",", dtype=np.float32, ndmin=2)
+    if inp_f0.ndim != 2 or inp_f0.shape[1] < 2:
+        raise ValueError(f"f0 file {path} must have (time, hz) rows, got shape {inp_f0.shape}")
+    return inp_f0
@@ -573,7 +573,9 @@ class SynthesizerTrnMsNSFsidM(nn.Module):
         self.gin_channels = gin_channels
         # self.hop_length = hop_length#
         self.spk_embed_dim = spk_embed_dim
-        if self.gin_channels == 256:
+        # HuBERT feature width (256 for v1, 768 for v2); old callers relied on gin_channels
+        phone_dim = kwargs.get("phone_dim", 256 if self.gin_channels == 256 else 768)
+        if phone_dim == 256:
             self.enc_p = TextEncoder256(
                 inter_channels,
                 hidden_channels,
@@ -0,0 +1,92 @@
+# model_opt.py
+"""
+Load-time inference pass for the synthesizers in infer_pack.
+
+optimize_for_inference() folds every weight-norm reparameterization
+(GeneratorNSF.ups, the ResBlock convs, the WN layers of the coupling flow)
+into plain weights, so a forward no longer recomputes g * v / ||v|| for each
+conv. It also drops the training-only posterior encoder and turns off
+autograd on the parameters. The models' own remove_weight_norm() methods
+cannot be used here because they also walk enc_q, which inference deletes.
+
+parity_check() runs a model before and after the pass on the same random
+input and seed and reports the largest absolute difference of the output.
+"""
+
+import copy
+
+import torch
+from torch.nn.utils import remove_weight_norm
+from torch.nn.utils.weight_norm import WeightNorm
+
+from f0_io import coarse_f0
+
+
+def fold_weight_norm(model):
+    """Remove every weight_norm hook in ``model``; returns how many were folded."""
+    folded = 0
+    for module in model.modules():
+        names = [h.name for h in module._forward_pre_hooks.values() if isinstance(h, WeightNorm)]
+        for name in names:
+            remove_weight_norm(module, name)
+            folded += 1
+    return folded
+
+
+def optimize_for_inference(net_g):
+    """Prepare a loaded synthesizer for inference, in place. Returns ``net_g``."""
+    if hasattr(net_g, "enc_q"):
+        del net_g.enc_q
+    folded = fold_weight_norm(net_g)
+    net_g.requires_grad_(False)
+    net_g.eval()
+    print(f"[model_opt] folded {folded} weight-norm layers")
+    return net_g
+
+
+def _copy_model(model):
+    """
+    copy.deepcopy() of ``model`` that also works while weight_norm hooks are
+    attached. The hooks leave the derived weight as a non-leaf tensor, which
+    deepcopy rejects, so those weights are detached first; the next forward
+    recomputes them anyway.
+    """
+    with torch.no_grad():
+        for module in model.modules():
+            for hook in module._forward_pre_hooks.values():
+                if isinstance(hook, WeightNorm):
+                    setattr(module, hook.name, getattr(module, hook.name).detach())
+    return copy.deepcopy(model)
+
+
+def _dummy_inputs(net_g, if_f0, frames=200, seed=0):
+    gen = torch.Generator().manual_seed(seed)
+    dim = net_g.enc_p.emb_phone.in_features
+    phone = torch.randn(1, frames, dim, generator=gen)
+    lengths = torch.tensor([frames]).long()
+    sid = torch.tensor([0]).long()
+    if not if_f0:
+        return (phone, lengths, sid)
+    pitchf = 100.0 + 300.0 * torch.rand(1, frames, generator=gen)
+    pitch = torch.from_numpy(coarse_f0(pitchf.numpy()))
+    return (phone, lengths, pitch, pitchf, sid)
+
+
+def _infer(net_g, inputs, seed):
+    torch.manual_seed(seed)  # the flow prior and the NSF source are random
+    with torch.no_grad():
+        return net_g.infer(*inputs)[0]
+
+
+def parity_check(net_g, if_f0, seed=0):
+    """
+    Optimize a CPU float32 copy of ``net_g`` and compare it with the original
+    on one random input. Returns the max absolute output difference.
+    """
+    ref = _copy_model(net_g).float().cpu().eval()
+    for m in ref.modules():
+        if hasattr(m, "is_half"):
+            m.is_half = False  # SourceModuleHnNSF casts to half otherwise
+    opt = optimize_for_inference(_copy_model(ref))
+    inputs = _dummy_inputs(ref, if_f0, seed=seed)
+    return float((_infer(ref, inputs, seed) - _infer(opt, inputs, seed)).abs().max())
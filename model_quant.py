@@ -0,0 +1,161 @@
+# model_quant.py
+"""
+Opt-in dynamic int8 quantization for CPU inference.
+
+quantize_hubert() applies torch's dynamic int8 quantization to HuBERT's
+feed-forward (fc1/fc2), post_extract_proj and final_proj linears. The
+attention projections stay fp32 because fairseq's MultiheadAttention passes
+their raw weights to F.multi_head_attention_forward.
+
+quantize_synth() does the same for the text encoder (enc_p). Its attention
+projections are 1x1 Conv1d and its FFN convs are plain stride-1 Conv1d, so
+each becomes an unfold + Linear that dynamic quantization can run with int8
+GEMMs. The NSF decoder and the flow stay fp32: eager PyTorch has no dynamic
+int8 kernels for Conv1d / ConvTranspose1d, so fake-quantizing them would
+only cost quality.
+
+quality_report() compares a quantized synthesizer with its fp32 original on
+the same random input and seed and returns SNR, log-mel distance and
+throughput of both. The *_with_report() helpers print it (feature SNR and
+throughput for HuBERT).
+"""
+
+from time import perf_counter
+
+import torch
+from torch import nn
+
+from model_opt import _copy_model, _dummy_inputs, _infer
+
+_HUBERT_LINEARS = ("fc1", "fc2", "post_extract_proj", "final_proj")
+
+
+class UnfoldLinear(nn.Module):
+    """Stride-1, unpadded, ungrouped Conv1d computed as unfold + Linear."""
+
+    def __init__(self, conv):
+        super().__init__()
+        out_channels, in_channels, k = conv.weight.shape
+        self.kernel_size = k
+        self.dilation = conv.dilation[0]
+        self.linear = nn.Linear(in_channels * k, out_channels, bias=conv.bias is not None)
+        with torch.no_grad():
+            self.linear.weight.copy_(conv.weight.reshape(out_channels, in_channels * k))
+            if conv.bias is not None:
+                self.linear.bias.copy_(conv.bias)
+
+    def forward(self, x):  # [b, c, t] -> [b, out, t - (k - 1) * dilation]
+        span = (self.kernel_size - 1) * self.dilation + 1
+        frames = x.unfold(2, span, 1)[..., :: self.dilation]  # [b, c, t', k]
+        b, c, t, k = frames.shape
+        y = self.linear(frames.permute(0, 2, 1, 3).reshape(b, t, c * k))
+        return y.transpose(1, 2)
+
+
+def _convertible(conv):
+    return (
+        isinstance(conv, nn.Conv1d)
+        and conv.stride == (1,)
+        and conv.padding == (0,)
+        and conv.groups == 1
+        and conv.padding_mode == "zeros"
+    )
+
+
+def quantize_hubert(hubert):
+    """
+    Dynamic int8 on HuBERT's FFN and projection linears, in place. Sets
+    ``is_int8`` so the feature cache keys int8 features apart from fp32 ones.
+    """
+    names = {
+        name
+        for name, m in hubert.named_modules()
+        if isinstance(m, nn.Linear) and name.rsplit(".", 1)[-1] in _HUBERT_LINEARS
+    }
+    torch.ao.quantization.quantize_dynamic(hubert, names, dtype=torch.qint8, inplace=True)
+    hubert.is_int8 = True
+    print(f"[model_quant] HuBERT: {len(names)} linears -> dynamic int8")
+    return hubert
+
+
+def quantize_synth(net_g):
+    """Dynamic int8 on the text encoder's attention and FFN projections, in place."""
+    swapped = 0
+    for module in list(net_g.enc_p.modules()):
+        for name, child in list(module.named_children()):
+            if _convertible(child):
+                setattr(module, name, UnfoldLinear(child))
+                swapped += 1
+    torch.ao.quantization.quantize_dynamic(net_g.enc_p, {nn.Linear}, dtype=torch.qint8, inplace=True)
+    print(f"[model_quant] text encoder: {swapped} convs -> dynamic int8")
+    return net_g
+
+
+def _log_mel(audio, sr):
+    import librosa
+
+    mel = librosa.feature.melspectrogram(y=audio, sr=sr, n_fft=2048, hop_length=512, n_mels=80)
+    return torch.log(torch.from_numpy(mel).clamp(min=1e-5))
+
+
+def quality_report(net_fp32, net_q, if_f0, sr, repeats=3, seed=0):
+    """
+    {snr_db, mel_l1, fp32_s, int8_s, speedup} for ``net_q`` against
+    ``net_fp32`` (both CPU float32) on one random input.
+    """
+    inputs = _dummy_inputs(net_fp32, if_f0, seed=seed)
+    ref = _infer(net_fp32, inputs, seed)[0, 0]
+    out = _infer(net_q, inputs, seed)[0, 0]
+    noise = (ref - out).pow(2).sum().clamp(min=1e-12)
+    snr = float(10 * torch.log10(ref.pow(2).sum() / noise))
+    mel_l1 = float((_log_mel(ref.numpy(), sr) - _log_mel(out.numpy(), sr)).abs().mean())
+
+    def timed(net):
+        t0 = perf_counter()
+        for _ in range(repeats):
+            _infer(net, inputs, seed)
+        return (perf_counter() - t0) / repeats
+
+    fp32_s, int8_s = timed(net_fp32), timed(net_q)
+    return {
+        "snr_db": snr,
+        "mel_l1": mel_l1,
+        "fp32_s": fp32_s,
+        "int8_s": int8_s,
+        "speedup": fp32_s / max(int8_s, 1e-9),
+    }
+
+
+def quantize_synth_with_report(net_g, if_f0, sr):
+    """quantize_synth() plus a printed quality_report() against the fp32 model."""
+    ref = _copy_model(net_g)
+    quantize_synth(net_g)
+    r = quality_report(ref, net_g, if_f0, sr)
+    print(
+        f"[model_quant] int8 vs fp32: SNR {r['snr_db']:.1f} dB, log-mel L1 {r['mel_l1']:.3f}, "
+        f"{r['fp32_s'] * 1000:.0f} ms -> {r['int8_s'] * 1000:.0f} ms ({r['speedup']:.2f}x)"
+    )
+    return net_g
+
+
+def quantize_hubert_with_report(hubert, repeats=3, seed=0):
+    """quantize_hubert() plus a printed feature SNR / throughput against fp32."""
+    ref = _copy_model(hubert)
+    quantize_hubert(hubert)
+    source = torch.randn(1, 16000 * 5, generator=torch.Generator().manual_seed(seed))
+
+    def run(model):
+        with torch.no_grad():
+            t0 = perf_counter()
+            for _ in range(repeats):
+                feats = model.extract_features(source=source, padding_mask=None, output_layer=12)[0]
+            return feats, (perf_counter() - t0) / repeats
+
+    a, fp32_s = run(ref)
+    b, int8_s = run(hubert)
+    snr = float(10 * torch.log10(a.pow(2).sum() / (a - b).pow(2).sum().clamp(min=1e-12)))
+    print(
+        f"[model_quant] HuBERT int8 vs fp32: feature SNR {snr:.1f} dB, "
+        f"{fp32_s * 1000:.0f} ms -> {int8_s * 1000:.0f} ms ({fp32_s / max(int8_s, 1e-9):.2f}x)"
+    )
+    return hubert
@@ -1,21 +1,87 @@
 import ffmpeg
 import numpy as np
+import soundfile as sf
+from math import gcd
+from scipy.signal import resample_poly
+from rvc_cache import ArrayCache, file_hash
+
+# Frames per soundfile read when down-mixing into the output buffer
+_READ_BLOCK = 1 << 16
+
+# Decoded mono float32 audio per (file content, sample rate), see load_audio
+_audio_cache = ArrayCache("audio", mem_mb=256, disk_mb=4096)
+
+
+def _load_audio_native(file, sr):
+    """
+    Decode ``file`` in-process with soundfile (WAV/FLAC/OGG and whatever else
+    the installed libsndfile reads), down-mix into one preallocated float32
+    buffer and resample it to ``sr`` with a polyphase filter.
+    """
+    with sf.SoundFile(file) as f:
+        n, channels, file_sr = f.frames, f.channels, f.samplerate
+        audio = np.empty(n, dtype=np.float32)
+        if channels == 1:
+            got = f.read(n, dtype="float32", out=audio)
+            audio = audio[: got.shape[0]]
+        else:
+            block = np.empty((_READ_BLOCK, channels), dtype=np.float32)
+            pos = 0
+            while pos < n:
+                got = f.read(min(_READ_BLOCK, n - pos), dtype="float32", out=block)
+                k = got.shape[0]
+                if k == 0:
+                    break
+                np.mean(got, axis=1, out=audio[pos : pos + k])
+                pos += k
+            audio = audio[:pos]
+    if file_sr != sr:
+        g = gcd(sr, file_sr)
+        audio = resample_poly(audio, sr // g, file_sr // g).astype(np.float32, copy=False)
+    return audio
+
+
+def _load_audio_ffmpeg(file, sr):
+    # https://github.com/openai/whisper/blob/main/whisper/audio.py#L26
+    # This launches a subprocess to decode audio while down-mixing and resampling as necessary.
+    # Requires the ffmpeg CLI and `ffmpeg-python` package to be installed.
+    out, _ = (
+        ffmpeg.input(file, threads=0)
+        .output("-", format="f32le", acodec="pcm_f32le", ac=1, ar=sr)
+        .run(cmd=["ffmpeg", "-nostdin"], capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, np.float32).flatten()
 
 
 def load_audio(file, sr):
+    """
+    Mono float32 audio of ``file`` at ``sr``. Decodes are cached by file
+    content and rate, so the same song is decoded once across jobs, voice
+    models and the auto-pitch estimate. Cache hits may be read-only memmaps.
+    """
+    file = (
+        file.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
+    )  # 防止小白拷路径头尾带了空格和"和回车
+    key = None
+    if _audio_cache.enabled:
+        try:
+            key = file_hash(file, sr)
+        except OSError:
+            pass  # not a readable local file; let the decoders report it
+        else:
+            audio = _audio_cache.get(key)
+            if audio is not None:
+                return audio
+
     try:
-        # https://github.com/openai/whisper/blob/main/whisper/audio.py#L26
-        # This launches a subprocess to decode audio while down-mixing and resampling as necessary.
-        # Requires the ffmpeg CLI and `ffmpeg-python` package to be installed.
-        file = (
-            file.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
-        )  # 防止小白拷路径头尾带了空格和"和回车
-        out, _ = (
-            ffmpeg.input(file, threads=0)
-            .output("-", format="f32le", acodec="pcm_f32le", ac=1, ar=sr)
-            .run(cmd=["ffmpeg", "-nostdin"], capture_stdout=True, capture_stderr=True)
-        )
-    except Exception as e:
-        raise RuntimeError(f"Failed to load audio: {e}")
-
-    return np.frombuffer(out, np.float32).flatten()
\ No newline at end of file
+        audio = _load_audio_native(file, sr)
+    except RuntimeError:
+        # not a format libsndfile can decode; hand it to ffmpeg
+        try:
+            audio = _load_audio_ffmpeg(file, sr)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load audio: {e}")
+
+    if key is not None:
+        _audio_cache.put(key, audio)
+    return audio
@@ -0,0 +1,105 @@
+# onnx_hubert.py
+"""
+ONNX Runtime path for the HuBERT content encoder.
+
+export_hubert() loads hubert_base.pt through fairseq once and exports two
+truncated graphs: layer 9 with final_proj folded in (v1 voice models,
+256-d) and layer 12 (v2, 768-d). The transformer stops at the output layer,
+so the later layers are not in the graph. Exports take one unpadded chunk
+with a dynamic sample axis and are cached under
+``$RVC_CACHE_DIR/hubert_onnx/``, keyed by the checkpoint's mtime and size.
+
+OnnxHubert runs them on CPU and imports only onnxruntime, so fairseq is not
+imported at all once the exports exist. VC.extract_features_batch sends each
+chunk through encode() on its own instead of as a padded batch.
+"""
+
+import hashlib
+import os
+
+from rvc_cache import CACHE_ROOT
+
+HUBERT_PATH = "hubert_base.pt"
+
+# version -> (output layer, fold final_proj)
+LAYERS = {"v1": (9, True), "v2": (12, False)}
+
+
+def _onnx_path(version, ckpt=HUBERT_PATH):
+    st = os.stat(ckpt)
+    tag = hashlib.blake2b(f"{st.st_mtime_ns}:{st.st_size}".encode(), digest_size=6).hexdigest()
+    layer, proj = LAYERS[version]
+    return os.path.join(CACHE_ROOT, "hubert_onnx", f"hubert-l{layer}{'-proj' if proj else ''}-{tag}.onnx")
+
+
+def export_hubert(ckpt=HUBERT_PATH, opset=17):
+    """Export the v1 and v2 graphs of ``ckpt`` unless cached; returns {version: path}."""
+    paths = {v: _onnx_path(v, ckpt) for v in LAYERS}
+    missing = [v for v, p in paths.items() if not os.path.exists(p)]
+    if not missing:
+        return paths
+
+    import torch
+    from fairseq import checkpoint_utils
+
+    models, _, _ = checkpoint_utils.load_model_ensemble_and_task([ckpt])
+    hubert = models[0].float().eval()
+
+    class Truncated(torch.nn.Module):
+        def __init__(self, layer, proj):
+            super().__init__()
+            self.hubert = hubert
+            self.layer = layer
+            self.proj = proj
+
+        def forward(self, source):
+            x = self.hubert.extract_features(source=source, padding_mask=None, output_layer=self.layer)[0]
+            return self.hubert.final_proj(x) if self.proj else x
+
+    for v in missing:
+        path = paths[v]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                Truncated(*LAYERS[v]).eval(),
+                (torch.randn(1, 16000),),
+                tmp,
+                input_names=["source"],
+                output_names=["feats"],
+                dynamic_axes={"source": {1: "samples"}, "feats": {1: "frames"}},
+                opset_version=opset,
+            )
+        os.replace(tmp, path)
+        print(f"[onnx_hubert] exported {v} HuBERT to {path}")
+    return paths
+
+
+class OnnxHubert:
+    """ORT sessions for the exported HuBERT graphs, created per version on first use."""
+
+    is_onnx = True
+
+    def __init__(self, paths, threads=0):
+        self.paths = paths
+        self.threads = threads
+        self._sessions = {}
+
+    def _session(self, version):
+        sess = self._sessions.get(version)
+        if sess is None:
+            import onnxruntime as ort
+
+            opts = ort.SessionOptions()
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.threads:
+                opts.intra_op_num_threads = self.threads
+                opts.inter_op_num_threads = 1
+            sess = ort.InferenceSession(self.paths[version], opts, providers=["CPUExecutionProvider"])
+            self._sessions[version] = sess
+        return sess
+
+    def encode(self, source, version):
+        """(1, frames, dim) float32 features of one 1-D float32 chunk."""
+        version = "v1" if version == "v1" else "v2"
+        return self._session(version).run(["feats"], {"source": source.reshape(1, -1)})[0]
@@ -0,0 +1,134 @@
+# onnx_synth.py
+"""
+ONNX Runtime CPU backend for the f0 synthesizers.
+
+export_onnx() rebuilds a model.pth as infer_pack.models_onnx's
+SynthesizerTrnMsNSFsidM (weight norm folded, enc_q dropped) and exports it
+with dynamic batch and time axes. The flow prior noise is an explicit
+``rnd`` input. OnnxSynthesizer runs the export in an ORT CPU session behind
+the same infer() signature as the torch models, so VC.vc and VC.vc_batch use
+it unchanged.
+
+Exports are cached under ``$RVC_CACHE_DIR/synth/``, keyed by the checkpoint
+path, mtime and size. f0-less (_nono) models have no ONNX variant and stay
+on torch.
+
+Usage:
+  python onnx_synth.py model.pth [out.onnx]
+"""
+
+import hashlib
+import os
+import sys
+
+import torch
+
+from model_opt import fold_weight_norm
+from rvc_cache import CACHE_ROOT
+
+
+def _cached_path(weight_path):
+    st = os.stat(weight_path)
+    key = f"{os.path.realpath(weight_path)}:{st.st_mtime_ns}:{st.st_size}"
+    name = hashlib.blake2b(key.encode(), digest_size=10).hexdigest()
+    return os.path.join(CACHE_ROOT, "synth", f"{name}.onnx")
+
+
+def _build(cpt):
+    from infer_pack.models_onnx import SynthesizerTrnMsNSFsidM
+    from rvc_core import _assert_decoder_compatible, _safe_load_weights
+
+    cfg = list(cpt["config"])
+    weight = cpt["weight"]
+    cfg[-3] = weight["emb_g.weight"].shape[0]
+    phone_dim = weight["enc_p.emb_phone.weight"].shape[1]
+    net_g = SynthesizerTrnMsNSFsidM(*cfg, is_half=False, phone_dim=phone_dim)
+    _assert_decoder_compatible(net_g, weight)
+    _safe_load_weights(net_g, weight)
+    del net_g.enc_q
+    fold_weight_norm(net_g)
+    return net_g.eval().float(), phone_dim
+
+
+def export_onnx(weight_path, out_path=None, cpt=None, opset=17):
+    """Export ``weight_path`` to ONNX (default: the cache path); returns the path."""
+    path = out_path or _cached_path(weight_path)
+    if out_path is None and os.path.exists(path):
+        return path
+    if cpt is None:
+        cpt = torch.load(weight_path, map_location="cpu")
+    if int(cpt.get("f0", 1)) != 1:
+        raise ValueError(f"{weight_path} is an f0-less model; only f0 models can be exported")
+
+    net_g, phone_dim = _build(cpt)
+    frames = 200
+    inputs = (
+        torch.randn(1, frames, phone_dim),
+        torch.tensor([frames]).long(),
+        torch.randint(1, 255, (1, frames)).long(),
+        100.0 + 300.0 * torch.rand(1, frames),
+        torch.tensor([0]).long(),
+        torch.randn(1, net_g.inter_channels, frames),
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            net_g,
+            inputs,
+            tmp,
+            input_names=["phone", "phone_lengths", "pitch", "pitchf", "ds", "rnd"],
+            output_names=["audio"],
+            dynamic_axes={
+                "phone": {0: "batch", 1: "frames"},
+                "phone_lengths": {0: "batch"},
+                "pitch": {0: "batch", 1: "frames"},
+                "pitchf": {0: "batch", 1: "frames"},
+                "rnd": {0: "batch", 2: "frames"},
+                "audio": {0: "batch", 2: "samples"},
+            },
+            opset_version=opset,
+        )
+    os.replace(tmp, path)
+    print(f"[onnx_synth] exported {weight_path} to {path}")
+    return path
+
+
+class OnnxSynthesizer:
+    """ORT session with the torch synthesizers' infer() interface."""
+
+    def __init__(self, path, inter_channels, threads=0):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+        self.path = path
+        self.inter_channels = inter_channels
+        self.nbytes = os.path.getsize(path)
+        self.sess = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+    def infer(self, phone, phone_lengths, pitch, nsff0, sid, max_len=None):
+        n, frames = phone.shape[0], phone.shape[1]
+        rnd = torch.randn(n, self.inter_channels, frames) * 0.66666
+        feeds = {
+            "phone": phone.float().cpu().numpy(),
+            "phone_lengths": phone_lengths.cpu().numpy(),
+            "pitch": pitch.cpu().numpy(),
+            "pitchf": nsff0.float().cpu().numpy(),
+            # the export embeds one speaker and broadcasts it over the batch
+            "ds": sid[:1].cpu().numpy(),
+            "rnd": rnd.numpy(),
+        }
+        audio = self.sess.run(["audio"], feeds)[0]
+        if max_len is not None:
+            audio = audio[:, :, : max_len * (audio.shape[2] // frames)]
+        return (torch.from_numpy(audio),)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        raise SystemExit("usage: python onnx_synth.py model.pth [out.onnx]")
+    export_onnx(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
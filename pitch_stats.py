@@ -0,0 +1,148 @@
+# pitch_stats.py
+"""
+Sampled pitch statistics for auto-pitch.
+
+Auto-pitch only needs a robust centre of the singer's range, not a full
+contour. pitch_stats() splits the song into ``region_s`` regions, keeps the
+ones whose energy is within ``threshold_db`` of the loudest, and visits them
+in a fixed pseudo-random order so the sample is spread over the whole song.
+Each region goes through the NumPy YIN tracker and contributes the median of
+its voiced frames. Neighbouring frames are strongly correlated (vibrato,
+held notes), so the region medians, not the frames, are the samples: after
+every ``step`` regions the 95 % confidence interval of their median
+(order-statistic bounds) is checked, and sampling stops once it is narrower
+than ``ci_st`` semitones or the ``budget_s`` time budget runs out. If the
+budget runs out first, a warning is printed and the result is returned with
+``converged`` False, leaving any fallback to the caller; only with
+``exhaustive`` set are the remaining candidate regions analyzed as well,
+past the budget.
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from f0_yin import yin_f0
+
+
+class PitchStats:
+    """
+    median         median of the per-region median f0 (Hz), None if nothing
+                   voiced was found
+    percentiles    {p: Hz} for the requested percentiles of voiced f0
+    voiced_ratio   estimated voiced fraction of the whole song
+    ci_st          width of the median's 95 % confidence interval (semitones)
+    converged      whether ci_st reached the requested width
+    frames         voiced frames the percentiles are based on
+    regions        regions analyzed out of the energy-selected candidates
+    elapsed        seconds spent
+    """
+
+    def __init__(self, median, percentiles, voiced_ratio, ci_st, converged, frames, regions, elapsed):
+        self.median = median
+        self.percentiles = percentiles
+        self.voiced_ratio = voiced_ratio
+        self.ci_st = ci_st
+        self.converged = converged
+        self.frames = frames
+        self.regions = regions
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        med = "None" if self.median is None else f"{self.median:.1f}"
+        return (
+            f"PitchStats(median={med}, voiced_ratio={self.voiced_ratio:.2f}, "
+            f"ci_st={self.ci_st:.2f}, frames={self.frames}, regions={self.regions})"
+        )
+
+
+def _median_ci_st(medians):
+    """Width in semitones of the order-statistic 95 % interval of the median of ``medians``."""
+    n = len(medians)
+    if n < 6:  # min..max covers the median with less than 95 % below six samples
+        return float("inf")
+    half = 0.98 * np.sqrt(n)  # 1.96 * sqrt(n) / 2
+    lo = max(int(np.floor(n / 2 - half)), 0)
+    hi = min(int(np.ceil(n / 2 + half)), n - 1)
+    part = np.partition(np.asarray(medians), (lo, hi))
+    return 12.0 * np.log2(part[hi] / part[lo])
+
+
+def pitch_stats(
+    audio,
+    sr=16000,
+    budget_s=0.05,
+    ci_st=1.0,
+    percentiles=(10, 25, 75, 90),
+    region_s=0.5,
+    threshold_db=-30.0,
+    min_regions=8,
+    step=4,
+    f0_min=50.0,
+    f0_max=1100.0,
+    min_voiced=10,
+    exhaustive=False,
+    seed=0,
+):
+    """
+    Sampled PitchStats of ``audio`` (1-D, mono, ``sr`` Hz). Regions with fewer
+    than ``min_voiced`` voiced frames count towards the voiced ratio only.
+    """
+    t0 = perf_counter()
+    audio = np.asarray(audio, dtype=np.float32)
+    region = max(int(region_s * sr), 1)
+    n_regions = audio.shape[0] // region
+    if n_regions == 0:
+        n_regions, region = 1, audio.shape[0]
+    if region == 0:
+        return PitchStats(None, {}, 0.0, float("inf"), False, 0, 0, perf_counter() - t0)
+
+    energy = np.square(audio[: n_regions * region].reshape(n_regions, region)).mean(axis=1)
+    peak = energy.max()
+    candidates = np.flatnonzero(energy >= peak * 10.0 ** (threshold_db / 10.0)) if peak > 0 else []
+    order = np.random.default_rng(seed).permutation(candidates)
+
+    hop = sr // 100
+    edge = 3  # frames at each region edge that see YIN's zero padding
+    voiced, medians = [], []
+    analyzed = 0
+
+    def visit(k):
+        nonlocal analyzed
+        f0 = yin_f0(audio[k * region : (k + 1) * region], sr=sr, f0_min=f0_min, f0_max=f0_max, hop=hop)
+        f0 = f0[edge:-edge] if f0.shape[0] > 2 * edge else f0
+        analyzed += f0.shape[0]
+        f0 = f0[(f0 > f0_min) & (f0 < f0_max)]
+        voiced.append(f0)
+        if f0.shape[0] >= min_voiced:
+            medians.append(float(np.median(f0)))
+
+    remaining = iter(order)
+    for k in remaining:
+        visit(k)
+        if len(voiced) >= min_regions and len(voiced) % step == 0:
+            if _median_ci_st(medians) <= ci_st or perf_counter() - t0 >= budget_s:
+                break
+
+    width = _median_ci_st(medians)
+    if width > ci_st and len(voiced) < len(order):
+        print(
+            f"[pitch_stats] WARN: median CI {width:.2f} st > {ci_st:.2f} st after {len(voiced)} "
+            f"of {len(order)} regions"
+            + ("; analyzing the rest" if exhaustive else "")
+        )
+        if exhaustive:
+            for k in remaining:
+                visit(k)
+            width = _median_ci_st(medians)
+
+    pool = np.concatenate(voiced) if voiced else np.zeros(0)
+    if medians:
+        median = float(np.median(medians))
+        pct = {p: float(v) for p, v in zip(percentiles, np.percentile(pool, percentiles))}
+    else:
+        median, pct = None, {}
+    ratio = pool.size / analyzed * len(candidates) / n_regions if analyzed else 0.0
+    return PitchStats(
+        median, pct, ratio, width, width <= ci_st, int(pool.size), len(voiced), perf_counter() - t0
+    )
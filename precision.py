@@ -0,0 +1,58 @@
+# precision.py
+"""
+CPU precision profiles for HuBERT and the synthesizer.
+
+Config.precision picks a profile: "fp32", "bf16" (CPU autocast to bfloat16)
+or "auto" (bf16 when the CPU has native bf16 instructions, else fp32).
+Config.precision_hubert / precision_synth override it per stage, e.g.
+HuBERT in bf16 and the decoder in fp32. Profiles only apply on CPU; on CUDA
+the existing is_half switch decides, and with int8 quantization
+(Config.quantize) the stages stay fp32 since the quantized kernels take
+fp32 activations.
+
+Native support means avx512_bf16 or amx_bf16 in /proc/cpuinfo (Cooper Lake,
+Sapphire Rapids and later Xeons, Zen 4 and later EPYCs). Where cpuinfo is
+not available, oneDNN's own bf16 check is used.
+"""
+
+from contextlib import nullcontext
+
+import torch
+
+PROFILES = ("auto", "fp32", "bf16")
+
+_bf16 = None
+
+
+def cpu_bf16_supported() -> bool:
+    global _bf16
+    if _bf16 is None:
+        try:
+            with open("/proc/cpuinfo") as f:
+                flags = f.read()
+            _bf16 = "avx512_bf16" in flags or "amx_bf16" in flags
+        except OSError:
+            try:
+                _bf16 = bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+            except Exception:
+                _bf16 = False
+    return _bf16
+
+
+def stage_precision(config, stage: str) -> str:
+    """"fp32" or "bf16" for ``stage`` ("hubert" or "synth") under ``config``."""
+    if config.device != "cpu" or config.quantize:
+        return "fp32"
+    value = getattr(config, f"precision_{stage}", "") or config.precision
+    if value == "auto":
+        return "bf16" if cpu_bf16_supported() else "fp32"
+    if value not in PROFILES:
+        raise ValueError(f"Unknown precision profile for {stage}: {value}")
+    return value
+
+
+def autocast(config, stage: str):
+    """Context manager running ``stage`` in its precision (no-op for fp32)."""
+    if stage_precision(config, stage) == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return nullcontext()
@@ -0,0 +1,196 @@
+# rvc_cache.py
+"""
+Content-addressed array caches shared by the inference pipeline.
+
+Each named cache keeps a small in-memory LRU in front of an on-disk store of
+``.npy`` files under ``$RVC_CACHE_DIR/<name>/``. Disk entries are opened
+memory-mapped, so several worker processes reading the same entry share
+its pages. Both tiers are size bounded. Each cache keeps a running total of
+its disk usage (scanned once, on the first write) and only rescans the
+directory when the total passes the budget; the oldest files are then
+removed until the cache is back under ``TRIM_TO`` of it.
+
+Environment:
+  RVC_CACHE_DIR          root directory for on-disk caches
+                         (default: $XDG_CACHE_HOME/rvc_inferencing, i.e.
+                         ~/.cache/rvc_inferencing)
+  RVC_CACHE=0            disable every cache
+  RVC_CACHE_<NAME>=0     disable one cache (e.g. RVC_CACHE_HUBERT=0, RVC_CACHE_AUDIO=0)
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_ROOT = os.getenv("RVC_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "rvc_inferencing",
+)
+
+# fraction of the disk budget a trim brings a cache down to, so the next
+# rescan is only needed after that much new data
+TRIM_TO = 0.9
+
+
+def cache_enabled(name: str) -> bool:
+    if os.getenv("RVC_CACHE", "1") == "0":
+        return False
+    return os.getenv(f"RVC_CACHE_{name.upper()}", "1") != "0"
+
+
+def array_hash(arr: np.ndarray, *parts) -> str:
+    """Hash of an array's contents plus any extra key parts (method, params, ...)."""
+    arr = np.ascontiguousarray(arr)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{arr.dtype.str}{arr.shape}".encode())
+    h.update(memoryview(arr).cast("B"))
+    for p in parts:
+        h.update(b"\0" + str(p).encode())
+    return h.hexdigest()
+
+
+def file_hash(path: str, *parts, block: int = 1 << 20) -> str:
+    """Hash of a file's bytes plus any extra key parts, read in ``block``-byte pieces."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(block), b""):
+            h.update(buf)
+    for p in parts:
+        h.update(b"\0" + str(p).encode())
+    return h.hexdigest()
+
+
+class ArrayCache:
+    def __init__(self, name: str, mem_mb: int = 256, disk_mb: int = 2048, root: str = None):
+        self.name = name
+        self.dir = os.path.join(root or CACHE_ROOT, name)
+        self.mem_bytes = int(mem_mb) * 1024 * 1024
+        self.disk_bytes = int(disk_mb) * 1024 * 1024
+        self._mem = OrderedDict()
+        self._mem_used = 0
+        self._disk_used = None  # bytes on disk; scanned on the first put
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return cache_enabled(self.name)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, key[:2], key + ".npy")
+
+    def get(self, key: str):
+        """Return the cached array (possibly a read-only memmap) or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            arr = self._mem.get(key)
+            if arr is not None:
+                self._mem.move_to_end(key)
+                return arr
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            arr = np.load(path, mmap_mode="r")
+            os.utime(path)  # bump for disk LRU
+        except Exception as e:
+            print(f"[rvc_cache] WARN: dropping unreadable {self.name} entry {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self._remember(key, arr)
+        return arr
+
+    def put(self, key: str, arr: np.ndarray, dtype=None) -> None:
+        if not self.enabled:
+            return
+        arr = np.ascontiguousarray(arr if dtype is None else arr.astype(dtype))
+        self._remember(key, arr)
+        if self.disk_bytes <= 0:
+            return
+
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+                written = f.tell()
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[rvc_cache] WARN: failed writing {self.name} entry: {e}")
+            return
+
+        with self._lock:
+            scan = self._disk_used is None
+            if not scan:
+                self._disk_used += written - replaced
+                over = self._disk_used > self.disk_bytes
+        if scan:
+            total = sum(size for _, size, _ in self._disk_entries())
+            with self._lock:
+                self._disk_used = total
+            over = total > self.disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _remember(self, key: str, arr: np.ndarray) -> None:
+        if arr.nbytes > self.mem_bytes:
+            return
+        with self._lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_used -= old.nbytes
+            self._mem[key] = arr
+            self._mem_used += arr.nbytes
+            while self._mem_used > self.mem_bytes:
+                _, old = self._mem.popitem(last=False)
+                self._mem_used -= old.nbytes
+
+    def _disk_entries(self):
+        """[(mtime, size, path)] of every entry on disk."""
+        entries = []
+        for root, _, files in os.walk(self.dir):
+            for n in files:
+                if not n.endswith(".npy"):
+                    continue
+                p = os.path.join(root, n)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def _trim_disk(self) -> None:
+        # rescan: other processes may have written to or trimmed the same dir
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.disk_bytes:
+            target = self.disk_bytes * TRIM_TO
+            for _, size, p in sorted(entries):
+                try:
+                    os.remove(p)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+        with self._lock:
+            self._disk_used = total
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_used = 0
@@ -1,6 +1,6 @@
 # rvc_core.py
-import os, torch, warnings, traceback
-from fairseq import checkpoint_utils
+import os, torch, warnings, traceback, threading
+from collections import OrderedDict
 from vc_infer_pipeline import VC
 from infer_pack.models import (
     SynthesizerTrnMs256NSFsid,
@@ -11,7 +11,9 @@ from infer_pack.models import (
 from my_utils import load_audio
 from scipy.io import wavfile          # (kept for compatibility, even if unused)
 from config import Config
+from model_opt import optimize_for_inference, parity_check
 import soundfile as sf
+from time import time as ttime
 
 # -----------------------------
 # Global config / state
@@ -38,10 +40,28 @@ def load_hubert():
     global hubert_model
     if hubert_model is not None:
         return
+    if config.hubert_backend == "onnx":
+        from onnx_hubert import OnnxHubert, export_hubert
+
+        # fairseq is imported only if the exports are not cached yet
+        hubert_model = OnnxHubert(export_hubert(), config.hubert_threads)
+        return
+    from fairseq import checkpoint_utils  # heavy; only needed once HuBERT is loaded
+
     models, _, _ = checkpoint_utils.load_model_ensemble_and_task(["hubert_base.pt"])
     hubert_model = models[0].to(config.device)
     hubert_model = hubert_model.half() if config.is_half else hubert_model.float()
     hubert_model.eval()
+    if _quantize_on_cpu():
+        from model_quant import quantize_hubert, quantize_hubert_with_report
+
+        (quantize_hubert_with_report if config.quantize_report else quantize_hubert)(hubert_model)
+
+
+def _quantize_on_cpu():
+    if config.quantize and config.device != "cpu":
+        print("[rvc_core] WARN: int8 quantization is CPU-only; ignoring RVC_QUANTIZE")
+    return config.quantize and config.device == "cpu"
 
 
 # -----------------------------
@@ -138,9 +158,31 @@ def _detect_arch_from_weight(weight: dict) -> str:
 # -----------------------------
 # Core: load VC model
 # -----------------------------
-def get_vc(weight_path, sid=0):
-    global tgt_sr, net_g, vc, cpt, version
+class ModelHandle:
+    """A loaded voice model: synthesizer, its VC pipeline and checkpoint metadata."""
+
+    def __init__(self, key, weight_path, cpt, net_g, vc, tgt_sr, version):
+        self.key = key
+        self.weight_path = weight_path
+        self.cpt = cpt
+        self.net_g = net_g
+        self.vc = vc
+        self.tgt_sr = tgt_sr
+        self.version = version
+        if isinstance(net_g, torch.nn.Module):
+            self.nbytes = sum(
+                t.numel() * t.element_size()
+                for t in list(net_g.parameters()) + list(net_g.buffers())
+            )
+        else:
+            self.nbytes = getattr(net_g, "nbytes", 0)
+
+    @property
+    def if_f0(self):
+        return self.cpt.get("f0", 1)
 
+
+def _load_model(weight_path, key=None) -> ModelHandle:
     print(f"Loading model: {weight_path}")
     cpt = torch.load(weight_path, map_location="cpu")
 
@@ -169,6 +211,17 @@ def get_vc(weight_path, sid=0):
     use_f0 = int(cpt.get("f0", 1))
     version = str(cpt.get("version", arch))
 
+    if config.synth_backend == "onnx":
+        if use_f0 == 1:
+            from onnx_synth import OnnxSynthesizer, export_onnx
+
+            path = export_onnx(weight_path, cpt=cpt)
+            net_g = OnnxSynthesizer(path, cfg[2], config.synth_threads)
+            print(f"[rvc_core] synthesizer backend: onnxruntime ({path})")
+            meta = {k: v for k, v in cpt.items() if k != "weight"}
+            return ModelHandle(key, weight_path, meta, net_g, VC(tgt_sr, config), tgt_sr, version)
+        print("[rvc_core] WARN: f0-less models have no ONNX variant; using torch")
+
     # Instantiate correct class
     if arch == "256":
         # “v2-style” (192,256)
@@ -193,17 +246,108 @@ def get_vc(weight_path, sid=0):
     # Load weights with logging
     _safe_load_weights(net_g, weight)
 
+    if config.optimize_models:
+        if config.optimize_check:
+            print(f"[rvc_core] optimize parity: max abs diff {parity_check(net_g, use_f0):.3e}")
+        optimize_for_inference(net_g)
+
     net_g.eval().to(config.device)
     net_g = net_g.half() if config.is_half else net_g.float()
+    if _quantize_on_cpu():
+        from model_quant import quantize_synth, quantize_synth_with_report
+
+        if config.quantize_report:
+            quantize_synth_with_report(net_g, use_f0, tgt_sr)
+        else:
+            quantize_synth(net_g)
+
+    # The raw weights now live in net_g; keep only the checkpoint metadata
+    meta = {k: v for k, v in cpt.items() if k != "weight"}
+    return ModelHandle(key, weight_path, meta, net_g, VC(tgt_sr, config), tgt_sr, version)
+
+
+class ModelRegistry:
+    """
+    LRU cache of loaded voice models keyed by checkpoint path + mtime + size,
+    so a rewritten .pth is reloaded. Evicts the least recently used models once
+    more than ``max_models`` are resident or, if ``max_mb`` > 0, once their
+    parameters exceed that many MB. The most recent model is never evicted.
+    """
+
+    def __init__(self, max_models=4, max_mb=0):
+        self.max_models = max(1, int(max_models))
+        self.max_bytes = int(max_mb) * 1024 * 1024
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(weight_path):
+        st = os.stat(weight_path)
+        return (os.path.realpath(weight_path), st.st_mtime_ns, st.st_size)
+
+    def get(self, weight_path) -> ModelHandle:
+        key = self._key(weight_path)
+        with self._lock:
+            handle = self._models.get(key)
+            if handle is not None:
+                self._models.move_to_end(key)
+                print(f"[rvc_core] model cache hit: {weight_path}")
+                return handle
+
+            # Drop stale entries for the same file (checkpoint was rewritten)
+            for k in [k for k in self._models if k[0] == key[0]]:
+                del self._models[k]
+
+            handle = _load_model(weight_path, key)
+            self._models[key] = handle
+            self._evict()
+            return handle
+
+    def _evict(self):
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_models
+            or (self.max_bytes and self.total_bytes() > self.max_bytes)
+        ):
+            _, old = self._models.popitem(last=False)
+            print(f"[rvc_core] evicting model: {old.weight_path}")
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def total_bytes(self):
+        return sum(h.nbytes for h in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
 
-    vc = VC(tgt_sr, config)
+registry = ModelRegistry(config.model_cache_size, config.model_cache_mb)
+
+
+def load_model(weight_path) -> ModelHandle:
+    """Return a handle for ``weight_path``, loading it only on a cache miss."""
+    return registry.get(weight_path)
+
+
+def get_vc(weight_path, sid=0):
+    """Load (or reuse) a model and make it the module-level current model."""
+    global tgt_sr, net_g, vc, cpt, version
+
+    handle = load_model(weight_path)
+    tgt_sr, net_g, vc, cpt, version = (
+        handle.tgt_sr,
+        handle.net_g,
+        handle.vc,
+        handle.cpt,
+        handle.version,
+    )
     return vc
 
 
 # -----------------------------
-# Single-file inference helper
+# Single-file inference helpers
 # -----------------------------
-def vc_single(
+def run_inference(
     sid,
     input_audio,
     f0_up_key,
@@ -213,42 +357,117 @@ def vc_single(
     index_rate,
     crepe_hop_length,
     output_path=None,
+    handle=None,
 ):
-    global tgt_sr, net_g, vc, hubert_model
-
+    """
+    Convert one file and return per-stage timings in seconds. Uses ``handle``
+    (from load_model) if given, else the model last set by get_vc. Unlike
+    vc_single, errors are raised to the caller.
+    """
     if input_audio is None:
         raise ValueError("No input audio file provided.")
+    if handle is None:
+        if vc is None or net_g is None:
+            raise RuntimeError("No voice model loaded; call get_vc() first.")
+        handle = ModelHandle(None, None, cpt, net_g, vc, tgt_sr, version)
+
+    timings = {}
+    t0 = ttime()
+    audio = load_audio(input_audio, 16000)
+    timings["load_audio"] = ttime() - t0
+
+    if hubert_model is None:
+        t0 = ttime()
+        load_hubert()
+        timings["load_hubert"] = ttime() - t0
+
+    # normalize FAISS index naming
+    file_index = file_index.strip().replace("trained", "added")
+    times = [0, 0, 0]
+
+    print(f"Using the following f0 method: {f0_method}")
+    args = (
+        hubert_model,
+        handle.net_g,
+        sid,
+        audio,
+        times,
+        int(f0_up_key),
+        f0_method,
+        file_index,
+        index_rate,
+        handle.if_f0,
+        handle.version,
+        crepe_hop_length,
+        f0_file,
+    )
+    t0 = ttime()
+    if output_path:
+        # Stream each converted chunk to the file as soon as it is ready
+        fmt = "FLAC" if output_path.lower().endswith(".flac") else "WAV"
+        timings["write"] = 0.0
+        try:
+            with sf.SoundFile(output_path, "w", samplerate=handle.tgt_sr, channels=1, format=fmt) as out:
+
+                def sink(chunk):
+                    t_w = ttime()
+                    out.write(chunk)
+                    out.flush()
+                    timings["write"] += ttime() - t_w
+
+                handle.vc.pipeline(*args, sink=sink)
+        except BaseException:
+            # never leave a truncated file behind for the caller's output checks
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+    else:
+        handle.vc.pipeline(*args)
+    timings["pipeline"] = ttime() - t0
+    # times[] is filled by VC.pipeline: [hubert+index, f0, synthesizer]
+    timings["hubert"], timings["f0"], timings["synth"] = times
 
-    try:
-        audio = load_audio(input_audio, 16000)
+    print(f"Inference complete: {output_path}")
+    return timings
 
-        if hubert_model is None:
-            load_hubert()
 
-        # normalize FAISS index naming
-        file_index = file_index.strip().replace("trained", "added")
-        times = [0, 0, 0]
+def analyze_f0(input_audio, f0_method, crepe_hop_length, handle=None):
+    """
+    Unshifted f0 contour of ``input_audio`` as the pipeline computes it.
+    Running a conversion of the same file afterwards reuses this analysis.
+    """
+    vc_obj = handle.vc if handle is not None else vc
+    if vc_obj is None:
+        raise RuntimeError("No voice model loaded; call get_vc() first.")
+    audio = load_audio(input_audio, 16000)
+    return vc_obj.analyze_f0(audio, f0_method, int(crepe_hop_length))
+
 
-        print(f"Using the following f0 method: {f0_method}")
-        audio_opt = vc.pipeline(
-            hubert_model,
-            net_g,
+def vc_single(
+    sid,
+    input_audio,
+    f0_up_key,
+    f0_file,
+    f0_method,
+    file_index,
+    index_rate,
+    crepe_hop_length,
+    output_path=None,
+    handle=None,
+):
+    try:
+        return run_inference(
             sid,
-            audio,
-            times,
-            int(f0_up_key),
+            input_audio,
+            f0_up_key,
+            f0_file,
             f0_method,
             file_index,
             index_rate,
-            cpt.get("f0", 1),
-            version,
             crepe_hop_length,
-            None,
+            output_path,
+            handle,
         )
-
-        if output_path:
-            sf.write(output_path, audio_opt, tgt_sr, format="WAV")
-        print(f"Inference complete: {output_path}")
     except Exception:
         print("❌ Inference failed:")
         traceback.print_exc()
@@ -3,8 +3,6 @@ import argparse
 import os
 import hashlib
 
-from rvc_core import get_vc, vc_single
-
 AUDIO_EXTS = [".wav", ".mp3", ".flac", ".m4a", ".ogg", ".aac"]
 
 def _md5(path: str) -> str:
@@ -90,8 +88,34 @@ def _resolve_output_path(output_arg: str | None, user: str, model_name: str, inp
     return os.path.join(out_dir, f"{base_name}_RVC.wav")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Headless RVC inferencing (user/model mode)")
+def _check_output(input_path: str, output_path: str) -> None:
+    if not os.path.exists(output_path):
+        raise RuntimeError(f"RVC did not produce an output file: {output_path}")
+
+    # Fail hard if output is byte-identical to input (likely passthrough / no conversion)
+    in_md5 = _md5(input_path)
+    out_md5 = _md5(output_path)
+    print(f"Input MD5:  {in_md5}")
+    print(f"Output MD5: {out_md5}")
+    if in_md5 == out_md5:
+        raise RuntimeError(
+            "RVC output is identical to input (no conversion applied). "
+            "Verify model path, index usage, and inference runtime."
+        )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Headless RVC inferencing (user/model mode)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "caches:\n"
+            "  Decoded audio, HuBERT features, f0 curves and ONNX exports are cached on disk\n"
+            "  under $RVC_CACHE_DIR (default: $XDG_CACHE_HOME/rvc_inferencing, i.e.\n"
+            "  ~/.cache/rvc_inferencing). RVC_CACHE=0 turns off the audio, HuBERT and f0\n"
+            "  caches; RVC_CACHE_AUDIO=0, RVC_CACHE_HUBERT=0 or RVC_CACHE_F0=0 turn off one."
+        ),
+    )
 
     parser.add_argument("--user", required=True)
     parser.add_argument("--model_name", required=True)
@@ -104,9 +128,73 @@ def main():
     parser.add_argument("--output", default=None, help="Output wav path or directory (auto if omitted)")
 
     parser.add_argument("--pitch", type=int, default=0)
-    parser.add_argument("--f0_method", default="harvest")
+    parser.add_argument("--f0_method", default="harvest", help="pm | harvest | dio | yin | crepe | crepe-tiny")
     parser.add_argument("--index_rate", type=float, default=0.5)
     parser.add_argument("--crepe_hop_length", type=int, default=128)
+    parser.add_argument("--f0_file", default=None, help="Replace the input f0 with a time,hz CSV or a .npy curve")
+    parser.add_argument(
+        "--segment_batch",
+        type=int,
+        default=None,
+        help="Convert this many chunks per batch (default: RVC_SEGMENT_BATCH or 1)",
+    )
+    parser.add_argument(
+        "--skip_silence",
+        type=float,
+        default=None,
+        help="Emit zeros for silences at least this many seconds long (default: RVC_SKIP_SILENCE_S or 0 = off)",
+    )
+    parser.add_argument(
+        "--hp_block",
+        type=float,
+        default=None,
+        help="Stream the high-pass filter in blocks of this many seconds (default: RVC_HP_BLOCK_S or 0 = whole song)",
+    )
+    parser.add_argument(
+        "--f0_workers",
+        type=int,
+        default=None,
+        help="Processes for harvest/dio pitch analysis (default: RVC_F0_WORKERS or 1; 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--crepe_mode",
+        choices=["predict", "stream", "onnx"],
+        default=None,
+        help="Crepe execution: torchcrepe.predict, batched torch frames, or ONNX Runtime (default: RVC_CREPE_MODE or predict)",
+    )
+    parser.add_argument("--crepe_threads", type=int, default=None, help="Thread budget for crepe (default: RVC_CREPE_THREADS or 0 = library default)")
+    parser.add_argument("--crepe_precision", choices=["fp32", "fp16", "bf16"], default=None, help="Autocast precision for --crepe_mode stream (fp16 needs CUDA)")
+    parser.add_argument("--crepe_batch", type=int, default=None, help="Crepe frames per batch for --crepe_mode stream/onnx (default: RVC_CREPE_BATCH or 512)")
+    parser.add_argument(
+        "--crepe_decoder",
+        choices=["viterbi", "argmax"],
+        default=None,
+        help="Crepe decoder for --crepe_mode stream/onnx (default: RVC_CREPE_DECODER or viterbi)",
+    )
+    parser.add_argument(
+        "--synth_backend",
+        choices=["torch", "onnx"],
+        default=None,
+        help="Synthesizer execution: eager torch or ONNX Runtime CPU (default: RVC_SYNTH_BACKEND or torch)",
+    )
+    parser.add_argument("--synth_threads", type=int, default=None, help="ORT thread budget for --synth_backend onnx (default: RVC_SYNTH_THREADS or 0 = ORT default)")
+    parser.add_argument(
+        "--hubert_backend",
+        choices=["torch", "onnx"],
+        default=None,
+        help="HuBERT execution: fairseq torch or ONNX Runtime CPU (default: RVC_HUBERT_BACKEND or torch)",
+    )
+    parser.add_argument("--hubert_threads", type=int, default=None, help="ORT thread budget for --hubert_backend onnx (default: RVC_HUBERT_THREADS or 0 = ORT default)")
+    parser.add_argument("--quantize", action="store_true", default=None, help="Dynamic int8 HuBERT / text encoder on CPU (default: RVC_QUANTIZE)")
+    parser.add_argument("--quantize_report", action="store_true", default=None, help="Log int8 vs fp32 quality and speed at model load")
+    parser.add_argument(
+        "--precision",
+        choices=["auto", "fp32", "bf16"],
+        default=None,
+        help="CPU precision profile; auto = bf16 where the CPU supports it (default: RVC_PRECISION or fp32)",
+    )
+    parser.add_argument("--precision_hubert", choices=["auto", "fp32", "bf16"], default=None, help="Override --precision for HuBERT")
+    parser.add_argument("--precision_synth", choices=["auto", "fp32", "bf16"], default=None, help="Override --precision for the synthesizer")
 
     # Backward-compat flags (currently unused by this repo's rvc_core.vc_single)
     parser.add_argument("--protect", type=float, default=0.33)
@@ -115,7 +203,63 @@ def main():
     parser.add_argument("--rms_mix_rate", type=float, default=0.25)
     parser.add_argument("--mix_rate", type=float, default=0.0)
 
-    args = parser.parse_args()
+    return parser
+
+
+def apply_config(args):
+    """
+    Copy the tuning flags in ``args`` onto rvc_core.config and return rvc_core.
+    Must run before any model is loaded or pitch is analyzed, since those read
+    the config (auto_pitch_entry calls it before its shared f0 analysis).
+    """
+    # Imported only now so --help and argument errors skip torch, the model
+    # code and Config's CUDA probe
+    import rvc_core
+
+    if args.segment_batch is not None:
+        rvc_core.config.segment_batch = args.segment_batch
+    if args.skip_silence is not None:
+        rvc_core.config.skip_silence_s = args.skip_silence
+    if args.hp_block is not None:
+        rvc_core.config.hp_block_s = args.hp_block
+    if args.f0_workers is not None:
+        rvc_core.config.f0_workers = args.f0_workers or rvc_core.config.n_cpu
+    if args.crepe_mode is not None:
+        rvc_core.config.crepe_mode = args.crepe_mode
+    if args.crepe_threads is not None:
+        rvc_core.config.crepe_threads = args.crepe_threads
+    if args.crepe_precision is not None:
+        rvc_core.config.crepe_precision = args.crepe_precision
+    if args.crepe_batch is not None:
+        rvc_core.config.crepe_batch = args.crepe_batch
+    if args.crepe_decoder is not None:
+        rvc_core.config.crepe_decoder = args.crepe_decoder
+    if args.synth_backend is not None:
+        rvc_core.config.synth_backend = args.synth_backend
+    if args.synth_threads is not None:
+        rvc_core.config.synth_threads = args.synth_threads
+    if args.hubert_backend is not None:
+        rvc_core.config.hubert_backend = args.hubert_backend
+    if args.hubert_threads is not None:
+        rvc_core.config.hubert_threads = args.hubert_threads
+    if args.quantize is not None:
+        rvc_core.config.quantize = True
+    if args.quantize_report is not None:
+        rvc_core.config.quantize_report = True
+    if args.precision is not None:
+        rvc_core.config.precision = args.precision
+    if args.precision_hubert is not None:
+        rvc_core.config.precision_hubert = args.precision_hubert
+    if args.precision_synth is not None:
+        rvc_core.config.precision_synth = args.precision_synth
+
+    return rvc_core
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    apply_config(args)
+    from rvc_core import get_vc, vc_single
 
     model_dir = _model_dir(args.user, args.model_name)
     model_path = args.model or os.path.join(model_dir, "model.pth")
@@ -144,7 +288,7 @@ def main():
         0,
         input_path,
         args.pitch,
-        None,
+        args.f0_file,
         args.f0_method,
         file_index,
         args.index_rate,
@@ -152,19 +296,7 @@ def main():
         output_path,
     )
 
-    if not os.path.exists(output_path):
-        raise RuntimeError(f"RVC did not produce an output file: {output_path}")
-
-    # Fail hard if output is byte-identical to input (likely passthrough / no conversion)
-    in_md5 = _md5(input_path)
-    out_md5 = _md5(output_path)
-    print(f"Input MD5:  {in_md5}")
-    print(f"Output MD5: {out_md5}")
-    if in_md5 == out_md5:
-        raise RuntimeError(
-            "RVC output is identical to input (no conversion applied). "
-            "Verify model path, index usage, and inference runtime."
-        )
+    _check_output(input_path, output_path)
 
     print(f"✅ Done! Output saved to {output_path}")
 
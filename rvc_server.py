@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+rvc_server.py
+
+Long-running inference daemon built on rvc_core.
+
+The one-shot path (infer_b2_entrypoint.sh -> auto_pitch_entry.py ->
+rvc_infer_cli.py) pays for importing torch/fairseq, loading HuBERT and
+loading the voice model on every song. This server does that work once and
+then accepts jobs over a local HTTP port or a Unix socket:
+
+  python rvc_server.py --port 7866
+  python rvc_server.py --socket /tmp/rvc.sock
+
+API (JSON in, JSON out):
+  GET  /health  -> {"ok": true, "model": <loaded model path or null>}
+  POST /infer   -> body uses the same fields as rvc_infer_cli.py:
+                   user, model_name, model, index, input, output, pitch,
+                   f0_method, index_rate, crepe_hop_length
+                   reply: {"ok": true, "output": ..., "timings": {...}}
+
+Jobs run one at a time. Voice models stay resident in rvc_core.registry
+(RVC_MODEL_CACHE_SIZE / RVC_MODEL_CACHE_MB), so alternating between models
+does not reload them. Timings are reported per stage in seconds.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import time as ttime
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7866
+
+
+# -----------------------------
+# Client helper
+# -----------------------------
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def submit_job(server: str, job: dict, timeout=None) -> dict:
+    """
+    POST a job to a running server and return the decoded reply.
+
+    ``server`` is either ``http://host:port`` or ``unix:/path/to/socket``.
+    Raises RuntimeError if the server reports a failure.
+    """
+    if server.startswith("unix:"):
+        conn = _UnixHTTPConnection(server[len("unix:"):], timeout=timeout)
+    else:
+        hostport = server.split("://", 1)[-1].rstrip("/")
+        conn = http.client.HTTPConnection(hostport, timeout=timeout)
+
+    body = json.dumps(job).encode("utf-8")
+    try:
+        conn.request("POST", "/infer", body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        reply = json.loads(resp.read().decode("utf-8") or "{}")
+    finally:
+        conn.close()
+
+    if resp.status != 200 or not reply.get("ok"):
+        raise RuntimeError(f"[rvc_server] job failed ({resp.status}): {reply.get('error')}")
+    return reply
+
+
+# -----------------------------
+# Job execution
+# -----------------------------
+class InferenceService:
+    """Holds the resident models and runs jobs sequentially."""
+
+    def __init__(self):
+        import rvc_core
+
+        self.core = rvc_core
+        self.lock = threading.Lock()
+        self.model_path = None
+
+        t0 = ttime()
+        rvc_core.load_hubert()
+        print(f"[rvc_server] HuBERT loaded in {ttime() - t0:.2f}s")
+
+    def run(self, job: dict) -> dict:
+        import rvc_infer_cli as cli
+
+        user = job.get("user")
+        model_name = job.get("model_name")
+        if not user or not model_name:
+            raise ValueError("Job must provide 'user' and 'model_name'.")
+        if not job.get("input"):
+            raise ValueError("Job must provide 'input'.")
+
+        model_dir = cli._model_dir(user, model_name)
+        model_path = job.get("model") or os.path.join(model_dir, "model.pth")
+        model_dir_for_index = os.path.dirname(model_path) if job.get("model") else model_dir
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found: {model_path}")
+
+        index_path = job.get("index") or cli._resolve_index_path(model_dir_for_index)
+        input_path = cli._resolve_song_input(job["input"])
+        output_path = cli._resolve_output_path(job.get("output"), user, model_name, input_path)
+
+        with self.lock:
+            t_start = ttime()
+            handle = self.core.load_model(model_path)
+            self.model_path = model_path
+            timings = {"load_model": ttime() - t_start}
+            timings.update(
+                self.core.run_inference(
+                    int(job.get("sid", 0)),
+                    input_path,
+                    int(job.get("pitch", 0)),
+                    None,
+                    job.get("f0_method", "harvest"),
+                    index_path or "",
+                    float(job.get("index_rate", 0.5)),
+                    int(job.get("crepe_hop_length", 128)),
+                    output_path,
+                    handle,
+                )
+            )
+            cli._check_output(input_path, output_path)
+            timings["total"] = ttime() - t_start
+
+        return {"ok": True, "output": output_path, "timings": timings}
+
+
+# -----------------------------
+# HTTP front end
+# -----------------------------
+class _Handler(BaseHTTPRequestHandler):
+    service: InferenceService = None
+
+    def address_string(self):
+        # AF_UNIX peers have no (host, port) tuple
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._reply(200, {"ok": True, "model": self.service.model_path})
+        else:
+            self._reply(404, {"ok": False, "error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/infer":
+            self._reply(404, {"ok": False, "error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            job = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except Exception as e:
+            self._reply(400, {"ok": False, "error": f"bad request body: {e}"})
+            return
+
+        try:
+            result = self.service.run(job)
+        except Exception as e:
+            traceback.print_exc()
+            self._reply(500, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+            return
+
+        print(f"[rvc_server] done {result['output']} timings={result['timings']}")
+        self._reply(200, result)
+
+
+class _UnixHTTPServer(socketserver.UnixStreamServer):
+    # BaseHTTPRequestHandler expects these from HTTPServer
+    server_name = "localhost"
+    server_port = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident RVC inference server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", default=None, help="Serve on this Unix socket path instead of TCP")
+    args = parser.parse_args()
+
+    _Handler.service = InferenceService()
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        httpd = _UnixHTTPServer(args.socket, _Handler)
+        print(f"[rvc_server] listening on unix:{args.socket}")
+    else:
+        httpd = HTTPServer((args.host, args.port), _Handler)
+        print(f"[rvc_server] listening on http://{args.host}:{args.port}")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# segmenter.py
+"""
+Cut-point planning for VC.pipeline.
+
+Long inputs are converted in chunks of roughly ``t_center`` samples. Each cut
+is placed within ``t_query`` samples of a multiple of ``t_center``: inside the
+longest stretch of true silence found by a frame-energy VAD if there is one,
+otherwise at the quietest point of a ``window``-sample moving sum (the
+original rule). Everything is computed in vectorized passes, so the cost no
+longer scales with ``window`` times the song length.
+
+SegmentPlan.spans() can also mark long silences as spans to skip, so the
+pipeline emits zeros there instead of running HuBERT and the synthesizer.
+"""
+
+import numpy as np
+
+
+class SegmentPlan:
+    """
+    cuts      chunk boundaries in samples of the unpadded audio
+    silent    per-frame VAD mask (True = silent), ``hop`` samples per frame
+    hop       VAD frame size in samples
+    length    length of the planned audio in samples
+    """
+
+    def __init__(self, cuts, silent, hop, length):
+        self.cuts = cuts
+        self.silent = silent
+        self.hop = hop
+        self.length = length
+
+    def __len__(self):
+        return len(self.cuts) + 1
+
+    def silences(self, min_samples=0):
+        """(start, end) sample ranges of silent runs at least ``min_samples`` long."""
+        return [
+            (s * self.hop, min(e * self.hop, self.length))
+            for s, e in _runs(self.silent)
+            if (e - s) * self.hop >= min_samples
+        ]
+
+    def spans(self, align, skip_min=0, margin=0):
+        """
+        Chunks as (start, end, skip) in samples of the unpadded audio. Cuts are
+        floored to multiples of ``align``. With ``skip_min`` > 0, silent runs at
+        least that long, minus ``margin`` samples of context kept on each side,
+        become ``skip`` spans (also ``align``-aligned) and cuts falling inside
+        them are dropped.
+        """
+        gaps = []
+        if skip_min > 0:
+            for s, e in self.silences(skip_min):
+                a = -(-(s + margin) // align) * align
+                b = (e - margin) // align * align
+                if b - a >= align:
+                    gaps.append((a, b))
+
+        points = {0, self.length}
+        for c in self.cuts:
+            c = c // align * align
+            if not any(a <= c <= b for a, b in gaps):
+                points.add(c)
+        for a, b in gaps:
+            points.update((a, b))
+        points = sorted(p for p in points if 0 <= p <= self.length)
+
+        gap_starts = dict(gaps)
+        return [
+            (s, e, gap_starts.get(s) == e)
+            for s, e in zip(points[:-1], points[1:])
+        ]
+
+    def __repr__(self):
+        return f"SegmentPlan(chunks={len(self)}, cuts={self.cuts}, length={self.length})"
+
+
+def _runs(mask):
+    """(start, end) index pairs of the True runs in a boolean array."""
+    if mask.size == 0:
+        return []
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def window_sums(audio, window):
+    """
+    Moving sum over ``window`` samples, centred like the original loop
+    ``sum(audio_pad[i : i - window] for i in range(window))`` with a
+    reflection pad of ``window // 2`` on both sides.
+    """
+    audio_pad = np.pad(audio, (window // 2, window // 2), mode="reflect")
+    c = np.empty(audio_pad.shape[0] + 1, dtype=np.float64)
+    c[0] = 0.0
+    np.cumsum(audio_pad, dtype=np.float64, out=c[1:])
+    n = audio.shape[0]
+    return (c[window : window + n] - c[:n]).astype(audio.dtype, copy=False)
+
+
+def frame_silence(audio, hop=160, threshold_db=-40.0):
+    """
+    Energy VAD: True for frames whose RMS is ``threshold_db`` or more below
+    the loudest frame. The last partial frame is padded with zeros.
+    """
+    n_frames = -(-audio.shape[0] // hop)
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+    frames = np.zeros(n_frames * hop, dtype=np.float32)
+    frames[: audio.shape[0]] = audio
+    energy = np.square(frames.reshape(n_frames, hop)).mean(axis=1)
+    peak = energy.max()
+    if peak <= 0:
+        return np.ones(n_frames, dtype=bool)
+    return energy < peak * 10.0 ** (threshold_db / 10.0)
+
+
+def plan_segments(
+    audio,
+    window,
+    t_center,
+    t_query,
+    t_max,
+    hop=160,
+    threshold_db=-40.0,
+):
+    """Build the SegmentPlan for ``audio`` (1-D, already high-passed)."""
+    n = audio.shape[0]
+    silent = frame_silence(audio, hop, threshold_db)
+    cuts = []
+    if n + window <= t_max:
+        return SegmentPlan(cuts, silent, hop, n)
+
+    audio_sum = np.abs(window_sums(audio, window))
+    for t in range(t_center, n, t_center):
+        lo, hi = t - t_query, min(t + t_query, n)
+        cost = audio_sum[lo:hi]
+
+        # Prefer the longest silent run inside the query window
+        f_lo, f_hi = -(-lo // hop), hi // hop
+        best = None
+        for s, e in _runs(silent[f_lo:f_hi]):
+            if best is None or e - s > best[1] - best[0]:
+                best = (s, e)
+        if best is not None:
+            s, e = (f_lo + best[0]) * hop - lo, (f_lo + best[1]) * hop - lo
+            cuts.append(lo + s + int(np.argmin(cost[s:e])))
+        else:
+            cuts.append(lo + int(np.argmin(cost)))
+    return SegmentPlan(cuts, silent, hop, n)
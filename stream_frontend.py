@@ -0,0 +1,107 @@
+# stream_frontend.py
+"""
+Block-streaming zero-phase high-pass for inputs too long to hold in memory.
+
+highpass_blocks() matches scipy.signal.sosfiltfilt block by block. The
+forward pass runs once over the whole stream with its state carried from
+block to block. The backward pass cannot see the future, so each output
+block is back-filtered over ``lookahead`` extra forward-filtered samples
+and the start-up transient dies out inside that margin. The song edges get
+the same odd extension and steady-state initial conditions sosfiltfilt
+uses, so the first and last blocks match it exactly. Memory is one block
+plus the lookahead.
+
+reflect_pad_blocks() then adds VC.pipeline's t_pad reflection on both ends
+of the stream, so VC.front_end can write the padded song block by block.
+"""
+
+import numpy as np
+from scipy import signal
+
+
+def _padlen(sos):
+    # scipy.signal.sosfiltfilt's default
+    return 3 * (2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum()))
+
+
+def highpass_blocks(blocks, sos, lookahead=8000):
+    """
+    Filter an iterable of 1-D float32 blocks with ``sos`` forwards and
+    backwards, yielding filtered float32 blocks (sizes may differ from the
+    input blocks, the concatenation has the same length).
+    """
+    padlen = _padlen(sos)
+    zi = signal.sosfilt_zi(sos).astype(np.float32)
+    dtype = np.float32
+
+    head = np.zeros(0, dtype=dtype)  # raw samples until the left extension can be built
+    tail = np.zeros(0, dtype=dtype)  # last padlen + 1 raw samples, for the right extension
+    fwd = np.zeros(0, dtype=dtype)  # forward-filtered samples not yet emitted (incl. extension)
+    state = None
+    skip = padlen  # left-extension samples at the front of fwd
+
+    def back(seg):
+        # backward pass over ``seg`` starting from steady state on its last sample
+        return signal.sosfilt(sos, seg[::-1], zi=zi * seg[-1])[0][::-1]
+
+    for block in blocks:
+        block = np.asarray(block, dtype=dtype)
+        if block.size == 0:
+            continue
+        tail = np.concatenate([tail, block])[-(padlen + 1) :]
+
+        if state is None:
+            head = np.concatenate([head, block])
+            if head.shape[0] <= padlen:
+                continue
+            block, head = head, None
+            ext = 2 * block[0] - block[padlen:0:-1]
+            block = np.concatenate([ext, block])
+            state = zi * block[0]
+
+        y, state = signal.sosfilt(sos, block, zi=state)
+        fwd = np.concatenate([fwd, y.astype(dtype, copy=False)])
+
+        ready = fwd.shape[0] - lookahead
+        if ready > skip:
+            out = back(fwd)[skip:ready]
+            fwd = fwd[ready:]
+            skip = 0
+            yield out.astype(dtype, copy=False)
+
+    if state is None:
+        # whole input shorter than the extension: filter it in one go
+        if head is not None and head.shape[0]:
+            yield signal.sosfiltfilt(sos, head, padlen=min(padlen, head.shape[0] - 1)).astype(dtype)
+        return
+
+    ext = 2 * tail[-1] - tail[-2 : -padlen - 2 : -1]
+    y, _ = signal.sosfilt(sos, ext, zi=state)
+    fwd = np.concatenate([fwd, y.astype(dtype, copy=False)])
+    yield back(fwd)[skip:-padlen].astype(dtype, copy=False)
+
+
+def reflect_pad_blocks(blocks, pad):
+    """
+    Yield the blocks of ``np.pad(concatenate(blocks), pad, mode="reflect")``
+    while holding back only the last ``pad + 1`` samples.
+    """
+    held = np.zeros(0, dtype=np.float32)
+    started = False
+    for block in blocks:
+        held = np.concatenate([held, np.asarray(block, dtype=np.float32)])
+        if not started:
+            if held.shape[0] <= pad:
+                continue
+            yield held[pad:0:-1].copy()
+            started = True
+        if held.shape[0] > pad + 1:
+            yield held[: -(pad + 1)]
+            held = held[-(pad + 1) :]
+
+    if not started:
+        # too short for a single reflection; let np.pad repeat it
+        if held.shape[0]:
+            yield np.pad(held, (pad, pad), mode="reflect")
+        return
+    yield np.concatenate([held, held[-2 : -pad - 2 : -1]])
@@ -0,0 +1,34 @@
+"""Batched HuBERT (vc_infer_pipeline.batched_hubert) against one chunk at a time."""
+
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("fairseq")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HUBERT = os.path.join(ROOT, "hubert_base.pt")
+
+
+@pytest.mark.skipif(not os.path.exists(HUBERT), reason="hubert_base.pt not present")
+@pytest.mark.parametrize("layer", [9, 12])
+def test_batched_matches_sequential(layer):
+    from fairseq import checkpoint_utils
+
+    from vc_infer_pipeline import batched_hubert
+
+    models, _, _ = checkpoint_utils.load_model_ensemble_and_task([HUBERT])
+    hubert = models[0].float().eval()
+    gen = torch.Generator().manual_seed(0)
+    # unequal lengths, so all but the longest chunk are padded in the batch
+    sources = [0.1 * torch.randn(n, generator=gen) for n in (16000 * 3, 16000 * 2 + 777, 9000)]
+
+    with torch.no_grad():
+        batched, frames = batched_hubert(hubert, sources, layer)
+        for j, source in enumerate(sources):
+            ref = hubert.extract_features(
+                source=source.unsqueeze(0), padding_mask=None, output_layer=layer
+            )[0]
+            assert ref.shape[1] == frames[j]
+            torch.testing.assert_close(batched[j : j + 1, : frames[j]], ref, atol=1e-4, rtol=1e-4)
@@ -0,0 +1,41 @@
+"""``rvc_infer_cli.py --help`` must not pull in the heavy inference stack."""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("torch", "fairseq", "faiss", "pyworld", "torchcrepe")
+BUDGET_US = 300_000  # cumulative import time of everything --help imports
+
+
+def _importtime(*args):
+    """[(module, nesting depth, cumulative microseconds)] from ``python -X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative)))
+    return modules
+
+
+def test_cli_help_skips_heavy_imports():
+    modules = _importtime("rvc_infer_cli.py", "--help")
+    heavy = {name.split(".")[0] for name, _, _ in modules} & set(HEAVY)
+    assert not heavy, sorted(heavy)
+
+    top = sorted(((us, name) for name, depth, us in modules if depth == 0), reverse=True)
+    total = sum(us for us, _ in top)
+    assert total < BUDGET_US, f"{total / 1000:.0f} ms: " + ", ".join(
+        f"{name} {us / 1000:.0f} ms" for us, name in top[:5]
+    )
@@ -0,0 +1,84 @@
+"""YIN tracker (f0_yin.py) and sampled pitch statistics (pitch_stats.py) on synthetic melodies."""
+
+from time import perf_counter
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from f0_yin import yin_f0
+from pitch_stats import pitch_stats
+
+SR = 16000
+NOTE_S = 0.5  # one note per pitch_stats region
+
+
+def _semitones(a, b):
+    return abs(12.0 * np.log2(a / b))
+
+
+def _melody(notes_hz, note_s=NOTE_S):
+    """Harmonic tone following ``notes_hz`` (one note per ``note_s``), and its true f0 per sample."""
+    f0 = np.repeat(np.asarray(notes_hz, dtype=np.float64), int(note_s * SR))
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    audio = 0.4 * np.sin(phase) + 0.2 * np.sin(2 * phase) + 0.1 * np.sin(3 * phase)
+    return audio.astype(np.float32), f0
+
+
+def _scale(n=25, base=110.0):
+    """``n`` chromatic notes from ``base``, each used equally often in a shuffled 3-minute melody."""
+    notes = base * 2.0 ** (np.arange(n) / 12.0)
+    order = np.random.default_rng(1).permutation(np.tile(np.arange(n), int(180 / NOTE_S) // n))
+    return notes, notes[order]
+
+
+@pytest.mark.parametrize("hz", [82.4, 220.0, 440.0, 880.0])
+def test_yin_steady_tone(hz):
+    audio, _ = _melody([hz], note_s=1.0)
+    f0 = yin_f0(audio, sr=SR, hop=160)
+    assert f0.shape[0] == audio.shape[0] // 160 + 1
+    inner = f0[5:-5]
+    assert (inner > 0).all()
+    assert np.max(_semitones(inner, hz)) < 0.1
+
+
+def test_yin_silence_is_unvoiced():
+    audio = np.zeros(SR, dtype=np.float32)
+    audio[: SR // 2], _ = _melody([220.0])
+    f0 = yin_f0(audio, sr=SR, hop=160)
+    assert (f0[60:] == 0).all()
+
+
+def test_pitch_stats_melody_median_and_percentiles():
+    notes, melody = _scale()
+    audio, true_f0 = _melody(melody)
+    stats = pitch_stats(audio, sr=SR, budget_s=10.0, exhaustive=True)
+
+    # 25 equally used notes: the median and these percentiles fall inside a note
+    assert _semitones(stats.median, notes[12]) < 0.1
+    for p, v in stats.percentiles.items():
+        assert _semitones(v, np.percentile(true_f0, p)) < 0.1, p
+    assert stats.voiced_ratio > 0.9
+
+
+def test_pitch_stats_converges_on_a_steady_voice():
+    audio, _ = _melody(np.full(120, 196.0))
+    stats = pitch_stats(audio, sr=SR, budget_s=10.0)
+    assert stats.converged and stats.ci_st <= 1.0
+    assert stats.regions < 120  # stopped once the interval was narrow enough
+    assert _semitones(stats.median, 196.0) < 0.1
+
+
+def test_pitch_stats_stops_at_the_budget():
+    _, melody = _scale()
+    audio, _ = _melody(melody)
+    budget = 0.05
+    t0 = perf_counter()
+    stats = pitch_stats(audio, sr=SR, budget_s=budget, ci_st=0.01)
+    elapsed = perf_counter() - t0
+
+    assert not stats.converged
+    assert stats.regions < audio.shape[0] // int(NOTE_S * SR)
+    # overshoot is at most one ``step`` of regions plus the final statistics
+    assert elapsed < budget + 0.25
+    assert stats.median is not None
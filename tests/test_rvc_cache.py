@@ -0,0 +1,34 @@
+"""ArrayCache disk budget accounting."""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import rvc_cache
+from rvc_cache import ArrayCache
+
+
+def _disk_bytes(path):
+    return sum(os.path.getsize(os.path.join(r, n)) for r, _, files in os.walk(path) for n in files)
+
+
+def test_put_stays_within_disk_budget(tmp_path):
+    cache = ArrayCache("t", mem_mb=0, disk_mb=1, root=str(tmp_path))
+    for i in range(40):
+        cache.put(f"{i:040x}", np.full(40_000, i, dtype=np.float32))  # ~160 kB each
+        assert _disk_bytes(cache.dir) <= cache.disk_bytes
+    assert cache.get(f"{39:040x}") is not None
+    assert cache.get(f"{0:040x}") is None
+
+
+def test_put_rescans_only_past_the_budget(tmp_path, monkeypatch):
+    cache = ArrayCache("t", mem_mb=0, disk_mb=1, root=str(tmp_path))
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(rvc_cache.os, "walk", lambda *a, **k: walks.append(1) or real_walk(*a, **k))
+    for i in range(5):  # ~800 kB, under the 1 MB budget
+        cache.put(f"{i:040x}", np.zeros(40_000, dtype=np.float32))
+    assert len(walks) == 1  # the initial scan
+    assert cache._disk_used == _disk_bytes(cache.dir)
@@ -0,0 +1,78 @@
+"""Cut planning (segmenter.py) on a tone with silent gaps."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from segmenter import SegmentPlan, plan_segments, window_sums
+
+SR, WINDOW = 16000, 160
+
+
+def _tone_with_gaps(n_gaps=12, tone_s=1.0, gap_s=1.5):
+    t = np.arange(int(tone_s * SR)) / SR
+    tone = (0.5 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+    gap = np.zeros(int(gap_s * SR), dtype=np.float32)
+    return np.concatenate([x for _ in range(n_gaps) for x in (tone, gap)])
+
+
+def _plan(audio):
+    return plan_segments(audio, WINDOW, t_center=4 * SR, t_query=SR, t_max=5 * SR, hop=WINDOW)
+
+
+def test_window_sums_matches_original_loop():
+    audio = np.random.default_rng(0).standard_normal(3000).astype(np.float32)
+    audio_pad = np.pad(audio, (WINDOW // 2, WINDOW // 2), mode="reflect")
+    ref = np.zeros_like(audio)
+    for i in range(WINDOW):
+        ref += audio_pad[i : i - WINDOW]
+    np.testing.assert_allclose(window_sums(audio, WINDOW), ref, rtol=1e-4, atol=1e-3)
+
+
+def test_cuts_land_in_silence():
+    audio = _tone_with_gaps()
+    plan = _plan(audio)
+    assert isinstance(plan, SegmentPlan)
+    assert len(plan.cuts) == (audio.shape[0] - 1) // (4 * SR)
+    for c in plan.cuts:
+        assert plan.silent[c // WINDOW]
+        assert audio[c] == 0.0
+
+
+def test_short_input_is_one_chunk():
+    audio = _tone_with_gaps(n_gaps=1)
+    plan = _plan(audio)
+    assert plan.cuts == [] and len(plan) == 1
+    assert plan.spans(WINDOW) == [(0, audio.shape[0], False)]
+
+
+@pytest.mark.parametrize("skip_min", [0, SR])
+def test_spans_cover_the_input(skip_min):
+    audio = _tone_with_gaps()
+    spans = _plan(audio).spans(WINDOW, skip_min=skip_min, margin=SR // 4)
+    assert spans[0][0] == 0 and spans[-1][1] == audio.shape[0]
+    for (_, e, _), (s, _, _) in zip(spans[:-1], spans[1:]):
+        assert e == s
+    for s, e, _ in spans[:-1]:
+        assert s % WINDOW == 0 and e % WINDOW == 0
+    # output length is preserved: the chunks add up to the input
+    assert sum(e - s for s, e, _ in spans) == audio.shape[0]
+
+
+def test_skip_spans_are_the_gaps_minus_margin():
+    audio = _tone_with_gaps()
+    margin = SR // 4
+    spans = _plan(audio).spans(WINDOW, skip_min=SR, margin=margin)
+    skipped = [(s, e) for s, e, skip in spans if skip]
+    assert len(skipped) == 12  # one per 1.5 s gap
+    period, tone = int(2.5 * SR), SR
+    for k, (s, e) in enumerate(skipped):
+        gap_start, gap_end = k * period + tone, (k + 1) * period
+        assert gap_start + margin <= s < gap_start + margin + WINDOW
+        assert gap_end - margin - WINDOW < e <= min(gap_end - margin, audio.shape[0])
+        assert not audio[s:e].any()
+    # voiced chunks never skip over a tone
+    for s, e, skip in spans:
+        if skip:
+            continue
+        assert e - s <= 5 * SR
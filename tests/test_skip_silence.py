@@ -0,0 +1,68 @@
+"""VC.pipeline output length with and without silence skipping."""
+
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+pytest.importorskip("scipy")
+
+from vc_infer_pipeline import VC
+
+SR, TGT_SR = 16000, 40000
+
+
+class ShortChunkVC(VC):
+    """VC whose "conversion" returns zeros one 10 ms frame short per chunk, like HuBERT can."""
+
+    def vc(self, model, net_g, sid, audio0, *args):
+        frames = audio0.shape[0] // self.window - 2
+        return np.zeros(frames * (self.tgt_sr // 100), dtype=np.float32)
+
+    def vc_batch(self, model, net_g, sid, chunks, *args):
+        return [self.vc(model, net_g, sid, chunk) for chunk in chunks]
+
+
+def _config(skip_silence_s):
+    return SimpleNamespace(
+        x_pad=1,
+        x_query=6,
+        x_center=38,
+        x_max=41,
+        is_half=False,
+        device="cpu",
+        hp_block_s=0,
+        silence_threshold_db=-40.0,
+        skip_silence_s=skip_silence_s,
+        silence_pad_s=0.25,
+        segment_batch=1,
+    )
+
+
+def _tone_with_gaps(n_gaps=30, tone_s=1.3, gap_s=1.7):
+    t = np.arange(int(tone_s * SR)) / SR
+    tone = (0.5 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+    gap = np.zeros(int(gap_s * SR), dtype=np.float32)
+    return np.concatenate([x for _ in range(n_gaps) for x in (tone, gap)])
+
+
+def _convert(audio, skip_silence_s):
+    vc = ShortChunkVC(TGT_SR, _config(skip_silence_s))
+    times = [0, 0, 0]
+    return vc.pipeline(None, None, 0, audio, times, 0, "pm", "", 0.0, 0, "v2", 128)
+
+
+def test_skipping_keeps_output_on_the_timeline():
+    audio = _tone_with_gaps()
+    expected = round(audio.shape[0] * TGT_SR / SR)
+    off = _convert(audio, 0.0)
+    on = _convert(audio, 1.0)
+
+    frame = TGT_SR // 100
+    # every skipped span re-aligns the output, so only the voiced tail after
+    # the last one can be short, however many gaps there are
+    assert 0 <= expected - on.shape[0] <= 2 * frame
+    # without skipping there are only a few long chunks to be short
+    assert 0 <= expected - off.shape[0] <= 4 * frame
+    assert on.shape[0] >= off.shape[0]
@@ -1,13 +1,137 @@
-import numpy as np, parselmouth, torch, pdb
+import numpy as np, torch
 from time import time as ttime
 import torch.nn.functional as F
-import torchcrepe # Fork feature. Use the crepe f0 algorithm. New dependency (pip install torchcrepe)
 import scipy.signal as signal
-import pyworld, os, traceback, faiss
+import os, traceback
 from scipy import signal
 from torch import Tensor # Fork Feature. Used for pitch prediction for the torchcrepe f0 inference computation
+from collections import OrderedDict
+from rvc_cache import ArrayCache, array_hash
+from segmenter import plan_segments
+
+# parselmouth, pyworld (f0_world), torchcrepe (f0_crepe) and faiss are imported
+# where they are used, so a job only loads the backends its options select
+from f0_yin import yin_f0
+from f0_io import F0_MIN, F0_MAX, coarse_f0, load_f0_file
+from stream_frontend import highpass_blocks, reflect_pad_blocks
+from precision import autocast, stage_precision
+
+# 48 Hz high-pass as float32 second-order sections (run zero-phase with sosfiltfilt)
+sos_hp = signal.butter(N=5, Wn=48, btype="high", fs=16000, output="sos").astype(np.float32)
+
+# HuBERT features per chunk, shared across voice models (see VC.extract_features)
+_feature_cache = ArrayCache("hubert", mem_mb=512, disk_mb=4096)
+# Unshifted f0 contours per padded input (see VC.get_f0_contour)
+_f0_cache = ArrayCache("f0", mem_mb=64, disk_mb=512)
+
+# FAISS indexes per process: realpath -> ((mtime_ns, size), index, big_npy)
+_index_cache = OrderedDict()
+_INDEX_CACHE_SIZE = 4
+
+
+def _index_vectors_path(file_index):
+    return file_index + ".vectors.f16.npy"
+
+
+def _load_index_vectors(file_index, index):
+    """
+    All vectors of ``index`` as an fp16 (ntotal, d) array. They are written
+    once to a sidecar .npy next to the index and memory-mapped afterwards,
+    so later jobs (and other worker processes) skip reconstruct_n entirely.
+    """
+    path = _index_vectors_path(file_index)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(file_index):
+            big_npy = np.load(path, mmap_mode="r")
+            if big_npy.shape == (index.ntotal, index.d):
+                return big_npy
+    except Exception:
+        pass
+
+    big_npy = index.reconstruct_n(0, index.ntotal).astype(np.float16)
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, big_npy)
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r")
+    except Exception as e:
+        print(f"Could not write index vector store {path}: {e}")
+        return big_npy
+
+
+def load_index(file_index):
+    """
+    Return (index, big_npy) for a FAISS index file, cached per process and
+    reloaded only when the file changes. The index is read memory-mapped
+    where FAISS supports it (IVF inverted lists).
+    """
+    key = os.path.realpath(file_index)
+    st = os.stat(file_index)
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _index_cache.get(key)
+    if hit is not None and hit[0] == sig:
+        _index_cache.move_to_end(key)
+        return hit[1], hit[2]
+
+    import faiss
+
+    try:
+        index = faiss.read_index(file_index, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception:
+        index = faiss.read_index(file_index)
+    big_npy = _load_index_vectors(file_index, index)
+
+    _index_cache[key] = (sig, index, big_npy)
+    while len(_index_cache) > _INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return index, big_npy
+
+
+def batched_hubert(model, sources, layer):
+    """
+    fairseq HuBERT features of 1-D ``sources`` at ``layer`` in one transformer
+    pass: ((n, frames, dim) zero-padded features, frames per source).
+
+    The conv feature extractor runs per source because its GroupNorm
+    normalizes over time, so padded samples would shift every frame. The
+    transformer gets the padded frames with a padding mask, which zeroes them
+    ahead of the positional conv, so each row matches a single-source
+    extract_features() call.
+    """
+    if len(sources) == 1:
+        feats = model.extract_features(
+            source=sources[0].unsqueeze(0), padding_mask=None, output_layer=layer
+        )[0]
+        return feats, [feats.shape[1]]
+    rows = []
+    for source in sources:
+        x = model.layer_norm(model.forward_features(source.unsqueeze(0)).transpose(1, 2))
+        if model.post_extract_proj is not None:
+            x = model.post_extract_proj(x)
+        rows.append(x[0])
+    frames = [x.shape[0] for x in rows]
+    feats = rows[0].new_zeros(len(rows), max(frames), rows[0].shape[1])
+    for j, x in enumerate(rows):
+        feats[j, : frames[j]] = x
+    padding_mask = torch.arange(feats.shape[1], device=feats.device).unsqueeze(0) >= torch.tensor(
+        frames, device=feats.device
+    ).unsqueeze(1)
+    feats, _ = model.encoder(feats, padding_mask=padding_mask, layer=layer - 1)
+    return feats, frames
+
+
+def _fade_edge(seg, fade, end):
+    """Linear fade on the start (end=False) or end (end=True) of ``seg``, in place."""
+    if seg is None or seg.shape[0] == 0:
+        return
+    fade = min(fade, seg.shape[0])
+    ramp = np.linspace(0.0, 1.0, fade, dtype=seg.dtype)
+    if end:
+        seg[-fade:] *= ramp[::-1]
+    else:
+        seg[:fade] *= ramp
 
-bh, ah = signal.butter(N=5, Wn=48, btype="high", fs=16000)
 
 class VC(object):
     def __init__(self, tgt_sr, config):
@@ -27,6 +151,8 @@ class VC(object):
         self.t_center = self.sr * self.x_center  # 查询切点位置
         self.t_max = self.sr * self.x_max  # 免查询时长阈值
         self.device = config.device
+        self.config = config
+        self.tgt_sr = tgt_sr
 
     #region f0 Overhaul Region
     # Fork Feature: Get the best torch device to use for f0 algorithms that require a torch device. Will return the type (torch.device)
@@ -42,6 +168,8 @@ class VC(object):
 
     # Get the f0 via parselmouth computation
     def get_f0_pm_computation(self, x, time_step, f0_min, f0_max, p_len):
+        import parselmouth
+
         f0 = (
             parselmouth.Sound(x, self.sr)
             .to_pitch_ac(
@@ -60,27 +188,28 @@ class VC(object):
         return f0
 
     # Get the f0 via the pyworld computation. Fork Feature +dio along with harvest
+    # Config.f0_workers > 1 splits it across a process pool (see f0_world.py)
     def get_f0_pyworld_computation(self, x, f0_min, f0_max, f0_type):
-        if f0_type == "harvest":
-            f0, t = pyworld.harvest(
-                x.astype(np.double),
-                fs=self.sr,
-                f0_ceil=f0_max,
-                f0_floor=f0_min,
-                frame_period=10,
-            )
-        elif f0_type == "dio":
-            f0, t = pyworld.dio(
-                x.astype(np.double),
-                fs=self.sr,
-                f0_ceil=f0_max,
-                f0_floor=f0_min,
-                frame_period=10,
-            )
-        f0 = pyworld.stonemask(x.astype(np.double), f0, t, self.sr)
+        from f0_world import world_f0
+
+        f0 = world_f0(
+            x,
+            self.sr,
+            f0_min,
+            f0_max,
+            f0_type,
+            frame_period=10,
+            workers=self.config.f0_workers,
+        )
         f0 = signal.medfilt(f0, 3) 
         return f0
     
+    # Get the f0 via the vectorized NumPy YIN tracker (f0_yin.py). Close to harvest, far faster on CPU.
+    def get_f0_yin_computation(self, x, f0_min, f0_max):
+        f0 = yin_f0(x, self.sr, f0_min, f0_max, hop=self.window)
+        f0 = signal.medfilt(f0, 3)
+        return f0
+
     # Fork Feature: Get the f0 via the crepe algorithm from torchcrepe
     def get_f0_crepe_computation(
             self, 
@@ -92,28 +221,53 @@ class VC(object):
             model="full", # Either use crepe-tiny "tiny" or crepe "full". Default is full
     ):
         x = x.astype(np.float32) # fixes the F.conv2D exception. We needed to convert double to float.
-        x /= np.quantile(np.abs(x), 0.999)
         torch_device = self.get_optimal_torch_device()
-        audio = torch.from_numpy(x).to(torch_device, copy=True)
-        audio = torch.unsqueeze(audio, dim=0)
-        if audio.ndim == 2 and audio.shape[0] > 1:
-            audio = torch.mean(audio, dim=0, keepdim=True).detach()
-        audio = audio.detach()
+        mode = self.config.crepe_mode
         print("Initiating prediction with a crepe_hop_length of: " + str(hop_length))
-        pitch: Tensor = torchcrepe.predict(
-            audio,
-            self.sr,
-            hop_length,
-            f0_min,
-            f0_max,
-            model,
-            batch_size=hop_length * 2,
-            device=torch_device,
-            pad=True
-        )
+        if mode in ("stream", "onnx"):
+            # Fixed-size frame batches, decoded as they go (see f0_crepe.py)
+            from f0_crepe import crepe_f0
+
+            pitch, _ = crepe_f0(
+                x,
+                self.sr,
+                hop_length,
+                f0_min,
+                f0_max,
+                model,
+                device=torch_device if mode == "stream" else "cpu",
+                backend="torch" if mode == "stream" else "onnx",
+                batch_frames=self.config.crepe_batch,
+                threads=self.config.crepe_threads,
+                precision=self.config.crepe_precision,
+                decoder=self.config.crepe_decoder,
+            )
+        elif mode == "predict":
+            import torchcrepe # Fork feature. Use the crepe f0 algorithm. New dependency (pip install torchcrepe)
+
+            x /= np.quantile(np.abs(x), 0.999)
+            audio = torch.from_numpy(x).to(torch_device, copy=True)
+            audio = torch.unsqueeze(audio, dim=0)
+            if audio.ndim == 2 and audio.shape[0] > 1:
+                audio = torch.mean(audio, dim=0, keepdim=True).detach()
+            audio = audio.detach()
+            pitch: Tensor = torchcrepe.predict(
+                audio,
+                self.sr,
+                hop_length,
+                f0_min,
+                f0_max,
+                model,
+                batch_size=hop_length * 2,
+                device=torch_device,
+                pad=True
+            )
+            pitch = pitch.squeeze(0).cpu().float().numpy()
+        else:
+            raise ValueError(f"Unknown crepe mode: {mode}")
         p_len = p_len or x.shape[0] // hop_length
         # Resize the pitch for final f0
-        source = np.array(pitch.squeeze(0).cpu().float().numpy())
+        source = np.array(pitch, dtype=np.float32)
         source[source < 0.001] = np.nan
         target = np.interp(
             np.arange(0, len(source) * p_len, len(source)) / p_len,
@@ -123,24 +277,99 @@ class VC(object):
         f0 = np.nan_to_num(target)
         return f0 # Resized f0
     
+    def _crepe_key(self):
+        # Crepe settings that change the contour (batch size moves the viterbi batch edges)
+        c = self.config
+        return f"{c.crepe_mode}:{c.crepe_precision}:{c.crepe_decoder}:{c.crepe_batch}"
+
     #endregion
 
-    def get_f0(self, x, p_len, f0_up_key, f0_method, crepe_hop_length, inp_f0=None):
+    def get_f0_contour(self, x, p_len, f0_method, crepe_hop_length, f0_min=50, f0_max=1100):
+        """
+        Unshifted f0 contour (Hz) of the padded audio ``x``. Cached by audio
+        content, method and parameters, so re-renders with another pitch
+        shift or voice model skip pitch extraction.
+        """
+        key = None
+        if _f0_cache.enabled:
+            key = array_hash(
+                x, "f0", f0_method, p_len, f0_min, f0_max,
+                crepe_hop_length if f0_method.startswith("crepe") else 0,
+                self._crepe_key() if f0_method.startswith("crepe") else "",
+            )
+            cached = _f0_cache.get(key)
+            if cached is not None:
+                print("Using cached f0 contour for method: " + f0_method)
+                return np.array(cached, dtype=np.float64)
+
         time_step = self.window / self.sr * 1000
-        f0_min = 50
-        f0_max = 1100
-        f0_mel_min = 1127 * np.log(1 + f0_min / 700)
-        f0_mel_max = 1127 * np.log(1 + f0_max / 700)
         if f0_method == "pm":
             f0 = self.get_f0_pm_computation(x, time_step, f0_min, f0_max, p_len)
         elif f0_method == "harvest":
             f0 = self.get_f0_pyworld_computation(x, f0_min, f0_max, "harvest")
         elif f0_method == "dio": # Fork Feature
             f0 = self.get_f0_pyworld_computation(x, f0_min, f0_max, "dio")
+        elif f0_method == "yin":
+            f0 = self.get_f0_yin_computation(x, f0_min, f0_max)
         elif f0_method == "crepe": # Fork Feature: Adding a new f0 algorithm called crepe
             f0 = self.get_f0_crepe_computation(x, f0_min, f0_max, p_len, crepe_hop_length)
         elif f0_method == "crepe-tiny": # For Feature add crepe-tiny model
             f0 = self.get_f0_crepe_computation(x, f0_min, f0_max, p_len, crepe_hop_length, "tiny")
+        else:
+            raise ValueError(f"Unknown f0 method: {f0_method}")
+
+        if key is not None:
+            _f0_cache.put(key, f0.copy())  # callers shift f0 in place
+        return f0
+
+    def front_end(self, audio):
+        """
+        High-pass ``audio`` and reflection-pad it by t_pad on both sides, all
+        in float32. Returns (audio, audio_pad); ``audio`` is a view of the
+        centre of ``audio_pad``, so the song is held once at single width.
+        With Config.hp_block_s set, the filter and padding stream through
+        stream_frontend in blocks of that length instead of one whole-song
+        sosfiltfilt.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        n, pad = audio.shape[0], self.t_pad
+        block = int(self.config.hp_block_s * self.sr)
+        if 0 < block < n:
+            audio_pad = np.empty(n + 2 * pad, dtype=np.float32)
+            blocks = (audio[i : i + block] for i in range(0, n, block))
+            pos = 0
+            for seg in reflect_pad_blocks(highpass_blocks(blocks, sos_hp), pad):
+                audio_pad[pos : pos + seg.shape[0]] = seg
+                pos += seg.shape[0]
+            return audio_pad[pad : pad + n], audio_pad
+        if n <= pad:
+            # too short for a single reflection; let np.pad repeat it
+            audio_pad = np.pad(signal.sosfiltfilt(sos_hp, audio), (pad, pad), mode="reflect")
+            return audio_pad[pad : pad + n], audio_pad
+        audio_pad = np.empty(n + 2 * pad, dtype=np.float32)
+        centre = audio_pad[pad : pad + n]
+        centre[:] = signal.sosfiltfilt(sos_hp, audio)
+        audio_pad[:pad] = centre[pad:0:-1]
+        audio_pad[pad + n :] = centre[-2 : -pad - 2 : -1]
+        return centre, audio_pad
+
+    def analyze_f0(self, audio, f0_method, crepe_hop_length):
+        """
+        Unshifted f0 contour (one value per 10 ms) of a raw 16 kHz input,
+        computed with the same filter and padding as pipeline(). A following
+        pipeline() call on the same audio takes it from the f0 cache instead
+        of running the pitch tracker again.
+        """
+        audio, audio_pad = self.front_end(audio)
+        p_len = audio_pad.shape[0] // self.window
+        f0 = self.get_f0_contour(audio_pad, p_len, f0_method, crepe_hop_length)
+        start = self.t_pad // self.window
+        return f0[start : start + audio.shape[0] // self.window]
+
+    def get_f0(self, x, p_len, f0_up_key, f0_method, crepe_hop_length, inp_f0=None):
+        f0_min = F0_MIN
+        f0_max = F0_MAX
+        f0 = self.get_f0_contour(x, p_len, f0_method, crepe_hop_length, f0_min, f0_max)
 
         print("Using the following f0 method: " + f0_method)
         f0 *= pow(2, f0_up_key / 12)
@@ -151,59 +380,88 @@ class VC(object):
                 (inp_f0[:, 0].max() - inp_f0[:, 0].min()) * tf0 + 1
             ).astype("int16")
             replace_f0 = np.interp(
-                list(range(delta_t)), inp_f0[:, 0] * 100, inp_f0[:, 1]
+                np.arange(delta_t), inp_f0[:, 0] * 100, inp_f0[:, 1]
             )
             shape = f0[self.x_pad * tf0 : self.x_pad * tf0 + len(replace_f0)].shape[0]
             f0[self.x_pad * tf0 : self.x_pad * tf0 + len(replace_f0)] = replace_f0[
                 :shape
             ]
         # with open("test_opt.txt","w")as f:f.write("\n".join([str(i)for i in f0.tolist()]))
-        f0bak = f0.copy()
-        f0_mel = 1127 * np.log(1 + f0 / 700)
-        f0_mel[f0_mel > 0] = (f0_mel[f0_mel > 0] - f0_mel_min) * 254 / (
-            f0_mel_max - f0_mel_min
-        ) + 1
-        f0_mel[f0_mel <= 1] = 1
-        f0_mel[f0_mel > 255] = 255
-        f0_coarse = np.rint(f0_mel).astype(np.int)
+        f0_coarse = coarse_f0(f0, f0_min, f0_max)
 
-        return f0_coarse, f0bak  # 1-0
+        return f0_coarse, f0  # 1-0
 
-    def vc(
-        self,
-        model,
-        net_g,
-        sid,
-        audio0,
-        pitch,
-        pitchf,
-        times,
-        index,
-        big_npy,
-        index_rate,
-        version,
-    ):  # ,file_index,file_big_npy
-        feats = torch.from_numpy(audio0)
-        if self.is_half:
-            feats = feats.half()
-        else:
+    def extract_features(self, model, audio0, version):
+        """HuBERT content features for one chunk, shape (1, frames, dim)."""
+        return self.extract_features_batch(model, [audio0], version)[0]
+
+    def extract_features_batch(self, model, chunks, version):
+        """
+        HuBERT content features for a list of chunks, one (1, frames, dim)
+        tensor per chunk.
+
+        They depend only on the audio, the output layer and the precision, not
+        on the voice model, so they are cached by content hash and reused when
+        the same song is rendered with other models. Chunks that miss the
+        cache go through batched_hubert() together; only the ones that were
+        not padded there are cached.
+        """
+        layer = 9 if version == "v1" else 12
+        precision = "fp16" if self.is_half else stage_precision(self.config, "hubert")
+        if getattr(model, "is_onnx", False):
+            precision = "onnx-" + precision
+        elif getattr(model, "is_int8", False):  # model_quant.quantize_hubert
+            precision = "int8"
+        out = [None] * len(chunks)
+        keys = [None] * len(chunks)
+        if _feature_cache.enabled:
+            for i, audio0 in enumerate(chunks):
+                keys[i] = array_hash(audio0, "hubert", layer, version == "v1", precision)
+                cached = _feature_cache.get(keys[i])
+                if cached is not None:
+                    feats = torch.from_numpy(np.array(cached)).to(self.device)
+                    feats = feats.half() if self.is_half else feats.float()
+                    out[i] = feats.unsqueeze(0)
+
+        todo = [i for i in range(len(chunks)) if out[i] is None]
+        if not todo:
+            return out
+
+        if getattr(model, "is_onnx", False):
+            # ONNX Runtime HuBERT (onnx_hubert.py): one unpadded chunk per run
+            for i in todo:
+                source = np.asarray(chunks[i], dtype=np.float32)
+                if source.ndim == 2:  # double channels
+                    source = source.mean(-1)
+                feats = torch.from_numpy(model.encode(source, version)).to(self.device)
+                out[i] = feats.half() if self.is_half else feats
+                if keys[i] is not None:
+                    _feature_cache.put(keys[i], out[i][0].cpu().numpy(), dtype=np.float16)
+            return out
+
+        sources = []
+        for i in todo:
+            feats = torch.from_numpy(chunks[i])
+            if feats.dim() == 2:  # double channels
+                feats = feats.mean(-1)
+            assert feats.dim() == 1, feats.dim()
+            feats = feats.half() if self.is_half else feats.float()
+            sources.append(feats.to(self.device))
+
+        with torch.no_grad(), autocast(self.config, "hubert"):
+            feats, frames = batched_hubert(model, sources, layer)
+            if version == "v1":
+                feats = model.final_proj(feats)
+        if feats.dtype == torch.bfloat16:
             feats = feats.float()
-        if feats.dim() == 2:  # double channels
-            feats = feats.mean(-1)
-        assert feats.dim() == 1, feats.dim()
-        feats = feats.view(1, -1)
-        padding_mask = torch.BoolTensor(feats.shape).to(self.device).fill_(False)
-
-        inputs = {
-            "source": feats.to(self.device),
-            "padding_mask": padding_mask,
-            "output_layer": 9 if version == "v1" else 12,
-        }
-        t0 = ttime()
-        with torch.no_grad():
-            logits = model.extract_features(**inputs)
-            feats = model.final_proj(logits[0]) if version == "v1" else logits[0]
 
+        for j, i in enumerate(todo):
+            out[i] = feats[j : j + 1, : frames[j]]
+            if keys[i] is not None and frames[j] == feats.shape[1]:
+                _feature_cache.put(keys[i], out[i][0].cpu().numpy(), dtype=np.float16)
+        return out
+
+    def _apply_index(self, feats, index, big_npy, index_rate):
         if (
             isinstance(index, type(None)) == False
             and isinstance(big_npy, type(None)) == False
@@ -227,7 +485,25 @@ class VC(object):
                 torch.from_numpy(npy).unsqueeze(0).to(self.device) * index_rate
                 + (1 - index_rate) * feats
             )
+        return feats
 
+    def vc(
+        self,
+        model,
+        net_g,
+        sid,
+        audio0,
+        pitch,
+        pitchf,
+        times,
+        index,
+        big_npy,
+        index_rate,
+        version,
+    ):  # ,file_index,file_big_npy
+        t0 = ttime()
+        feats = self.extract_features(model, audio0, version)
+        feats = self._apply_index(feats, index, big_npy, index_rate)
         feats = F.interpolate(feats.permute(0, 2, 1), scale_factor=2).permute(0, 2, 1)
         t1 = ttime()
         p_len = audio0.shape[0] // self.window
@@ -237,7 +513,7 @@ class VC(object):
                 pitch = pitch[:, :p_len]
                 pitchf = pitchf[:, :p_len]
         p_len = torch.tensor([p_len], device=self.device).long()
-        with torch.no_grad():
+        with torch.no_grad(), autocast(self.config, "synth"):
             if pitch != None and pitchf != None:
                 audio1 = (
                     (net_g.infer(feats, p_len, pitch, pitchf, sid)[0][0, 0])
@@ -249,7 +525,7 @@ class VC(object):
                 audio1 = (
                     (net_g.infer(feats, p_len, sid)[0][0, 0]).data.cpu().float().numpy()
                 )
-        del feats, p_len, padding_mask
+        del feats, p_len
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         t2 = ttime()
@@ -257,6 +533,75 @@ class VC(object):
         times[2] += t2 - t1
         return audio1
 
+    def vc_batch(
+        self,
+        model,
+        net_g,
+        sid,
+        chunks,
+        pitches,
+        pitchfs,
+        times,
+        index,
+        big_npy,
+        index_rate,
+        version,
+    ):
+        """
+        Batched variant of vc(): converts several chunks with one HuBERT
+        forward and one net_g.infer call. Chunks are zero-padded to a common
+        length, the synthesizer masks the padding through its length input,
+        and each output is trimmed back to its own length. ``pitches`` and
+        ``pitchfs`` are lists of (1, frames) tensors, or None for f0-less
+        models.
+        """
+        t0 = ttime()
+        feats_list = self.extract_features_batch(model, chunks, version)
+        feats_list = [
+            F.interpolate(
+                self._apply_index(f, index, big_npy, index_rate).permute(0, 2, 1),
+                scale_factor=2,
+            ).permute(0, 2, 1)
+            for f in feats_list
+        ]
+        t1 = ttime()
+
+        p_lens = [
+            min(chunk.shape[0] // self.window, f.shape[1])
+            for chunk, f in zip(chunks, feats_list)
+        ]
+        n, frames = len(chunks), max(p_lens)
+        feats = torch.zeros(
+            n, frames, feats_list[0].shape[2], dtype=feats_list[0].dtype, device=self.device
+        )
+        for i, f in enumerate(feats_list):
+            feats[i, : p_lens[i]] = f[0, : p_lens[i]]
+        lengths = torch.tensor(p_lens, device=self.device).long()
+        sids = sid.repeat(n)
+
+        with torch.no_grad(), autocast(self.config, "synth"):
+            if pitches is not None:
+                # padded frames get the lowest coarse pitch and an unvoiced f0
+                pitch = torch.ones(n, frames, device=self.device).long()
+                pitchf = torch.zeros(n, frames, device=self.device).float()
+                for i in range(n):
+                    pitch[i, : p_lens[i]] = pitches[i][0, : p_lens[i]]
+                    pitchf[i, : p_lens[i]] = pitchfs[i][0, : p_lens[i]]
+                audio1 = net_g.infer(feats, lengths, pitch, pitchf, sids)[0][:, 0]
+            else:
+                audio1 = net_g.infer(feats, lengths, sids)[0][:, 0]
+            audio1 = audio1.data.cpu().float().numpy()
+
+        upp = audio1.shape[1] // frames
+        outs = [audio1[i, : p_lens[i] * upp] for i in range(n)]
+        del feats, lengths
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        t2 = ttime()
+        times[0] += t1 - t0
+        times[2] += t2 - t1
+        return outs
+
     def pipeline(
         self,
         model,
@@ -273,7 +618,15 @@ class VC(object):
         version,
         crepe_hop_length,
         f0_file=None,
+        sink=None,
     ):
+        """
+        Convert ``audio`` (16 kHz mono) and return it at the model's rate.
+
+        If ``sink`` is given, each converted chunk is passed to ``sink(chunk)``
+        in order as soon as it is ready and nothing is returned, so memory use
+        does not grow with the input length.
+        """
         if (
             file_index != ""
             # and file_big_npy != ""
@@ -282,45 +635,29 @@ class VC(object):
             and index_rate != 0
         ):
             try:
-                index = faiss.read_index(file_index)
-                # big_npy = np.load(file_big_npy)
-                big_npy = index.reconstruct_n(0, index.ntotal)
+                index, big_npy = load_index(file_index)
             except:
                 traceback.print_exc()
                 index = big_npy = None
         else:
             index = big_npy = None
-        audio = signal.filtfilt(bh, ah, audio)
-        audio_pad = np.pad(audio, (self.window // 2, self.window // 2), mode="reflect")
-        opt_ts = []
-        if audio_pad.shape[0] > self.t_max:
-            audio_sum = np.zeros_like(audio)
-            for i in range(self.window):
-                audio_sum += audio_pad[i : i - self.window]
-            for t in range(self.t_center, audio.shape[0], self.t_center):
-                opt_ts.append(
-                    t
-                    - self.t_query
-                    + np.where(
-                        np.abs(audio_sum[t - self.t_query : t + self.t_query])
-                        == np.abs(audio_sum[t - self.t_query : t + self.t_query]).min()
-                    )[0][0]
-                )
-        s = 0
+        audio, audio_pad = self.front_end(audio)
+        plan = plan_segments(
+            audio,
+            self.window,
+            self.t_center,
+            self.t_query,
+            self.t_max,
+            hop=self.window,
+            threshold_db=self.config.silence_threshold_db,
+        )
         audio_opt = []
-        t = None
         t1 = ttime()
-        audio_pad = np.pad(audio, (self.t_pad, self.t_pad), mode="reflect")
         p_len = audio_pad.shape[0] // self.window
         inp_f0 = None
-        if hasattr(f0_file, "name") == True:
+        if f0_file is not None:
             try:
-                with open(f0_file.name, "r") as f:
-                    lines = f.read().strip("\n").split("\n")
-                inp_f0 = []
-                for line in lines:
-                    inp_f0.append([float(i) for i in line.split(",")])
-                inp_f0 = np.array(inp_f0, dtype="float32")
+                inp_f0 = load_f0_file(f0_file)
             except:
                 traceback.print_exc()
         sid = torch.tensor(sid, device=self.device).unsqueeze(0).long()
@@ -333,75 +670,101 @@ class VC(object):
             pitchf = torch.tensor(pitchf, device=self.device).unsqueeze(0).float()
         t2 = ttime()
         times[1] += t2 - t1
-        for t in opt_ts:
-            t = t // self.window * self.window
-            if if_f0 == 1:
-                audio_opt.append(
+        # Chunks in unpadded samples; with silence skipping, long silent
+        # stretches become "skip" spans that are emitted as zeros.
+        skip_min = int(self.config.skip_silence_s * self.sr)
+        spans = plan.spans(
+            self.window,
+            skip_min=skip_min,
+            margin=int(self.config.silence_pad_s * self.sr) if skip_min else 0,
+        )
+        n = audio.shape[0]
+        fade = self.tgt_sr // 50  # 20 ms edge fade next to skipped spans
+
+        batch = max(1, int(self.config.segment_batch))
+        pending = []
+        emitted = 0  # output samples so far, to re-align at each skipped span
+
+        def flush():
+            if not pending:
+                return
+            chunks, pitches, pitchfs = [], [], []
+            for _, s, e in pending:
+                if e == n:
+                    chunks.append(audio_pad[s:])
+                    f0_end = None
+                else:
+                    chunks.append(audio_pad[s : e + self.t_pad2 + self.window])
+                    f0_end = (e + self.t_pad2) // self.window
+                if if_f0 == 1:
+                    pitches.append(pitch[:, s // self.window : f0_end])
+                    pitchfs.append(pitchf[:, s // self.window : f0_end])
+            if if_f0 != 1:
+                pitches = pitchfs = None
+            if len(pending) == 1:
+                outs = [
                     self.vc(
                         model,
                         net_g,
                         sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        pitch[:, s // self.window : (t + self.t_pad2) // self.window],
-                        pitchf[:, s // self.window : (t + self.t_pad2) // self.window],
+                        chunks[0],
+                        pitches[0] if pitches is not None else None,
+                        pitchfs[0] if pitchfs is not None else None,
                         times,
                         index,
                         big_npy,
                         index_rate,
                         version,
-                    )[self.t_pad_tgt : -self.t_pad_tgt]
-                )
+                    )
+                ]
             else:
-                audio_opt.append(
-                    self.vc(
-                        model,
-                        net_g,
-                        sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        None,
-                        None,
-                        times,
-                        index,
-                        big_npy,
-                        index_rate,
-                         version,
-                    )[self.t_pad_tgt : -self.t_pad_tgt]
-                )
-            s = t
-        if if_f0 == 1:
-            audio_opt.append(
-                self.vc(
-                    model,
-                    net_g,
-                    sid,
-                    audio_pad[t:],
-                    pitch[:, t // self.window :] if t is not None else pitch,
-                    pitchf[:, t // self.window :] if t is not None else pitchf,
-                    times,
-                    index,
-                    big_npy,
-                    index_rate,
-                     version,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
-            )
-        else:
-            audio_opt.append(
-                self.vc(
+                outs = self.vc_batch(
                     model,
                     net_g,
                     sid,
-                    audio_pad[t:],
-                    None,
-                    None,
+                    chunks,
+                    pitches,
+                    pitchfs,
                     times,
                     index,
                     big_npy,
                     index_rate,
-                     version,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
-            )
-        audio_opt = np.concatenate(audio_opt)
-        del pitch, pitchf, sid
+                    version,
+                )
+            for (k, _, _), out in zip(pending, outs):
+                emit(k, out[self.t_pad_tgt : -self.t_pad_tgt])
+            pending.clear()
+
+        def emit(k, seg):
+            nonlocal emitted
+            emitted += seg.shape[0]
+            if k > 0 and spans[k - 1][2]:
+                _fade_edge(seg, fade, end=False)
+            if k + 1 < len(spans) and spans[k + 1][2]:
+                _fade_edge(seg, fade, end=True)
+            if sink is not None:
+                sink(seg)
+            else:
+                audio_opt.append(seg)
+
+        for k, (s, e, skip) in enumerate(spans):
+            if skip:
+                flush()
+                # Converted chunks can come out a frame short; size the zeros
+                # so the span ends at its exact place on the output timeline
+                # instead of letting the shortfall add up across gaps.
+                zeros = max(round(e * self.tgt_sr / self.sr) - emitted, 0)
+                emit(k, np.zeros(zeros, dtype=np.float32))
+            else:
+                pending.append((k, s, e))
+                if len(pending) >= batch:
+                    flush()
+        flush()
+        skipped = sum(e - s for s, e, skip in spans if skip)
+        if skipped:
+            print(f"Skipped {skipped / self.sr:.1f}s of silence ({100.0 * skipped / max(n, 1):.0f}%)")
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
-        return audio_opt
\ No newline at end of file
+        if sink is not None:
+            return None
+        return np.concatenate(audio_opt)
\ No newline at end of file